@@ -13,6 +13,11 @@ def load_system():
 
 orch = load_system()
 
+# same prompt + tests -> same answer, skip the whole LLM + sandbox loop
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def cached_solve(prompt: str, tests: str, max_attempts: int):
+    return orch.solve(prompt, tests)
+
 st.title("🔧 Self-Correcting Code Generator")
 st.markdown("Enter a function description and tests. The system will generate code and fix errors automatically.")
 
@@ -40,7 +45,7 @@ if st.button("Generate & Test", type="primary"):
         st.error("Enter both prompt and tests")
     else:
         with st.spinner("Running..."):
-            result = orch.solve(prompt, tests)
+            result = cached_solve(prompt, tests, orch.max_attempts)
         
         for att in result.attempts:
             status = "YES" if att.status == "SUCCESS" else "NO"
@@ -57,6 +62,9 @@ if st.button("Generate & Test", type="primary"):
             st.error(f"Failed: {result.status}")
 
 with st.sidebar:
+    if st.button("Clear cache"):
+        cached_solve.clear()
+    
     st.header("Examples")
     if st.button("Factorial"):
         st.session_state.prompt = '''def factorial(n: int) -> int:
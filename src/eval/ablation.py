@@ -1,14 +1,15 @@
-import time
 import json
+import asyncio
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 
 from .benchmarks import load_mbpp
-from ..loop.orchestrator import Orchestrator
+from ..loop.orchestrator import Orchestrator, SolutionResult
 from ..llm.ollama_client import OllamaClient
 from ..sandbox.docker_runner import DockerSandbox
 from ..loop.error_parser import ErrorInfo, ErrorCategory
+from ..loop.patch_builder import extract_test_asserts
 
 console = Console()
 
@@ -25,8 +26,7 @@ Return ONLY the fixed code."""
 
 
 def with_tests_repair(code: str, error: ErrorInfo, tests: str) -> str:
-    test_lines = [l.strip() for l in tests.split('\n') if 'assert' in l]
-    test_str = "\n".join(test_lines[:5])
+    test_str = "\n".join(extract_test_asserts(tests))
     
     return f"""Fix this code:
 ```python
@@ -42,8 +42,7 @@ Return ONLY the fixed code."""
 
 
 def stepbystep_repair(code: str, error: ErrorInfo, tests: str) -> str:
-    test_lines = [l.strip() for l in tests.split('\n') if 'assert' in l]
-    test_str = "\n  ".join(test_lines[:5])
+    test_str = "\n  ".join(extract_test_asserts(tests))
     
     return f"""The code below produces WRONG OUTPUT.
 ```python
@@ -67,61 +66,74 @@ class AblationOrchestrator(Orchestrator):
         self.repair_fn = repair_fn
     
     def _build_repair(self, code, error, problem_desc, tests):
-        return self.repair_fn(code, error, tests)
+        # the strategies always show the whole code, nothing to merge back
+        return self.repair_fn(code, error, tests), ()
 
 
-def run_ablation(limit: int = 15):
+async def _run_strategy(name, repair_fn, problems, llm, sandbox, concurrency: int):
+    orch = AblationOrchestrator(repair_fn=repair_fn, llm=llm, sandbox=sandbox, max_attempts=3)
+    sem = asyncio.Semaphore(concurrency)
+    
+    async def solve_one(p):
+        async with sem:
+            try:
+                r = await orch.asolve(p.prompt, p.tests)
+            except Exception as e:
+                # recorded as an ERROR run so one failure doesn't abort the study
+                console.print(f"  {p.task_id} ({name}): [red]{type(e).__name__}: {e}[/red]")
+                return SolutionResult(status="ERROR", attempts=[])
+        console.print(f"  {p.task_id} ({name}): {'✓' if r.solved else '✗'}")
+        return r
+    
+    runs = await asyncio.gather(*[solve_one(p) for p in problems])
+    
+    pass1 = sum(1 for r in runs if r.solved and len(r.attempts) == 1)
+    pass3 = sum(1 for r in runs if r.solved)
+    
+    n = len(problems)
+    p1_pct = round(pass1 / n * 100, 1)
+    p3_pct = round(pass3 / n * 100, 1)
+    imp = round((p3_pct - p1_pct) / p1_pct * 100, 1) if p1_pct > 0 else 0
+    
+    console.print(f"[cyan]{name}[/cyan] Pass@1: {p1_pct}%, Pass@3: {p3_pct}%, Improvement: {imp}%")
+    return {
+        "pass_at_1": p1_pct,
+        "pass_at_3": p3_pct,
+        "improvement": imp
+    }
+
+
+def run_ablation(limit: int = 15, concurrency: int = 4):
     console.print("\n[bold]Ablation Study: Prompt Strategies[/bold]\n")
     
     problems = load_mbpp(limit=limit)
     console.print(f"Running on {len(problems)} MBPP problems\n")
     
-    sandbox = DockerSandbox()
-    llm = OllamaClient()
-    
     strategies = [
         ("basic", basic_repair),
         ("with_tests", with_tests_repair),
         ("step_by_step", stepbystep_repair),
     ]
     
-    results = {}
-    
-    for name, repair_fn in strategies:
-        console.print(f"[cyan]Testing: {name}[/cyan]")
-        
-        # monkey-patch the repair function
-        from ..loop import patch_builder
-        original = patch_builder.build_adaptive_repair_prompt
-        patch_builder.build_adaptive_repair_prompt = lambda c, e, p, t, fn=repair_fn: fn(c, e, t)
-        
-        orch = Orchestrator(llm=llm, sandbox=sandbox, max_attempts=3)
-        
-        pass1 = 0
-        pass3 = 0
-        
-        for p in problems:
-            r = orch.solve(p.prompt, p.tests)
-            if r.solved:
-                pass3 += 1
-                if len(r.attempts) == 1:
-                    pass1 += 1
-            console.print(f"  {p.task_id}: {'✓' if r.solved else '✗'}")
-        
-        # restore
-        patch_builder.build_adaptive_repair_prompt = original
-        
-        n = len(problems)
-        p1_pct = round(pass1 / n * 100, 1)
-        p3_pct = round(pass3 / n * 100, 1)
-        imp = round((p3_pct - p1_pct) / p1_pct * 100, 1) if p1_pct > 0 else 0
-        
-        results[name] = {
-            "pass_at_1": p1_pct,
-            "pass_at_3": p3_pct,
-            "improvement": imp
-        }
-        console.print(f"  Pass@1: {p1_pct}%, Pass@3: {p3_pct}%, Improvement: {imp}%\n")
+    # every strategy keeps up to `concurrency` runs in flight on the shared
+    # sandbox, so the pool needs a container for each of them
+    sandbox = DockerSandbox(pool_size=len(strategies) * concurrency)
+    llm = OllamaClient()
+    
+    # each strategy gets its own orchestrator but they all share one llm
+    # client (and its connection pool), so they can all run at once
+    async def run_all():
+        try:
+            return await asyncio.gather(*[
+                _run_strategy(name, fn, problems, llm, sandbox, concurrency)
+                for name, fn in strategies
+            ])
+        finally:
+            await llm.aclose()
+    
+    outcomes = asyncio.run(run_all())
+    results = {name: data for (name, _), data in zip(strategies, outcomes)}
+    console.print()
     
     # summary table
     table = Table(title="Ablation Results: Prompt Strategies")
@@ -142,8 +154,7 @@ def run_ablation(limit: int = 15):
     
     # save
     Path("runs").mkdir(exist_ok=True)
-    with open("runs/ablation_results.json", "w") as f:
-        json.dump(results, f, indent=2)
+    Path("runs/ablation_results.json").write_text(json.dumps(results, indent=2))
     console.print("\n[green]Saved to runs/ablation_results.json[/green]")
     
     return results
@@ -153,5 +164,6 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--limit", type=int, default=15)
+    parser.add_argument("--concurrency", type=int, default=4, help="problems in flight per strategy")
     args = parser.parse_args()
-    run_ablation(limit=args.limit)
+    run_ablation(limit=args.limit, concurrency=args.concurrency)
@@ -1,8 +1,20 @@
 # loading HumanEval and MBPP datasets
+import os
+import re
+import pickle
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 from typing import List, Optional
 from datasets import load_dataset
 
+# converted problem lists are pickled here so repeat runs skip the arrow load.
+# bump the version when the conversion below changes
+CACHE_DIR = Path.home() / ".cache" / "code-self-corrector"
+_CACHE_VERSION = 1
+
+_DEF_RE = re.compile(r"def\s+(\w+)\s*\(")
+
 
 @dataclass
 class Problem:
@@ -14,7 +26,48 @@ class Problem:
 
 
 def load_humaneval(limit: Optional[int] = None) -> List[Problem]:
-    ds = load_dataset("openai_humaneval", split="test")
+    return list(_load_cached("humaneval", limit or None))
+
+
+def load_mbpp(limit: Optional[int] = None) -> List[Problem]:
+    return list(_load_cached("mbpp", limit or None))
+
+
+@lru_cache(maxsize=None)
+def _load_cached(name: str, limit: Optional[int]) -> tuple:
+    path = CACHE_DIR / f"{name}_{limit or 'all'}_v{_CACHE_VERSION}.pkl"
+    return tuple(_cached_problems(path, _LOADERS[name], limit))
+
+
+def _cached_problems(path: Path, loader, limit: Optional[int]) -> List[Problem]:
+    if path.exists():
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # corrupt or stale cache file (e.g. pickled by an older version
+            # of Problem, which fails with AttributeError and friends), just
+            # rebuild it
+            pass
+    
+    problems = loader(limit)
+    
+    # write to a temp file and swap it in, so an interrupted run never
+    # leaves a truncated pickle behind
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(problems, f)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    
+    return problems
+
+
+def _load_humaneval(limit: Optional[int] = None) -> List[Problem]:
+    ds = _open_split("openai_humaneval", limit=limit)
     
     problems = []
     for i, item in enumerate(ds):
@@ -35,8 +88,8 @@ def load_humaneval(limit: Optional[int] = None) -> List[Problem]:
     return problems
 
 
-def load_mbpp(limit: Optional[int] = None) -> List[Problem]:
-    ds = load_dataset("mbpp", "sanitized", split="test")
+def _load_mbpp(limit: Optional[int] = None) -> List[Problem]:
+    ds = _open_split("mbpp", "sanitized", limit=limit)
     
     problems = []
     for i, item in enumerate(ds):
@@ -61,6 +114,17 @@ def load_mbpp(limit: Optional[int] = None) -> List[Problem]:
     return problems
 
 
+def _open_split(*args, limit: Optional[int] = None):
+    # with a limit, stream rows from the parquet shards and stop after
+    # `limit` instead of materializing the whole split in memory
+    if limit:
+        return load_dataset(*args, split="test", streaming=True)
+    return load_dataset(*args, split="test")
+
+
+_LOADERS = {"humaneval": _load_humaneval, "mbpp": _load_mbpp}
+
+
 def load_all(limit_each: Optional[int] = None) -> List[Problem]:
     # combining both datasets
     he = load_humaneval(limit_each)
@@ -80,25 +144,18 @@ def _convert_humaneval_tests(test_code: str, entry_point: str) -> str:
     if not result:
         return f"def test_main():\n    {test_code}"
     
-    out = "def test_main():\n"
-    for line in result:
-        stripped = line.strip()
-        out += f"    {stripped}\n"
-    
-    return out
+    body = "\n".join(f"    {line.strip()}" for line in result)
+    return f"def test_main():\n{body}\n"
 
 
 def _convert_mbpp_tests(test_list: List[str], task_id: int) -> str:
     # MBPP gives us a list of assert statements
-    out = f"def test_mbpp_{task_id}():\n"
-    for test in test_list:
-        out += f"    {test.strip()}\n"
-    return out
+    body = "\n".join(f"    {test.strip()}" for test in test_list)
+    return f"def test_mbpp_{task_id}():\n{body}\n"
 
 
 def _extract_function_name(code: str) -> str:
-    import re
-    match = re.search(r'def\s+(\w+)\s*\(', code)
+    match = _DEF_RE.search(code)
     if match:
         return match.group(1)
     return "solution"
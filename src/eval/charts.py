@@ -1,5 +1,8 @@
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import matplotlib
+matplotlib.use("Agg")  # files only - skip the GUI backend probe on headless boxes
 import matplotlib.pyplot as plt
 from .metrics import summary_stats, calculate_error_distribution, calculate_fixability
 
@@ -15,15 +18,25 @@ def generate_all_charts(results_path: str, output_dir: str = "reports"):
     errors = calculate_error_distribution(results)
     fixability = calculate_fixability(results)
     
-    _chart_pass_at_k(stats, output_dir)
+    specs = [("passk", stats, output_dir)]
     if errors:
-        _chart_error_distribution(errors, output_dir)
+        specs.append(("errors", errors, output_dir))
     if fixability:
-        _chart_fixability(fixability, output_dir)
+        specs.append(("fix", fixability, output_dir))
+    
+    # charts are independent, render each in its own process
+    with ProcessPoolExecutor(max_workers=len(specs)) as ex:
+        list(ex.map(_render_one, specs))
     
     print(f"Charts saved to {output_dir}/")
 
 
+def _render_one(spec):
+    # runs in a worker process - importing this module already set Agg
+    kind, data, output_dir = spec
+    _CHARTS[kind](data, output_dir)
+
+
 def _chart_pass_at_k(stats: dict, output_dir: str):
     fig, ax = plt.subplots(figsize=(8, 5))
     
@@ -97,6 +110,14 @@ def _chart_fixability(fixability: dict, output_dir: str):
     plt.savefig(f"{output_dir}/error_fixability.png", dpi=150)
     plt.close()
 
+
+_CHARTS = {
+    "passk": _chart_pass_at_k,
+    "errors": _chart_error_distribution,
+    "fix": _chart_fixability,
+}
+
+
 def chart_model_comparison(comparison_path: str, output_dir: str = "reports"):
     with open(comparison_path) as f:
         data = json.load(f)
@@ -1,5 +1,7 @@
+import os
 import json
 import time
+import asyncio
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
@@ -9,59 +11,89 @@ from ..loop.orchestrator import Orchestrator
 from ..llm.ollama_client import OllamaClient
 from ..llm.groq_client import GroqClient
 from ..sandbox.docker_runner import DockerSandbox
+from ..utils.ratelimit import AsyncRateLimiter
 
 console = Console()
 
 
+# groq free tier allows 30 requests/minute
+GROQ_RATE_LIMIT = 30
+
+
+async def _solve_one(name: str, orch: Orchestrator, p):
+    t0 = time.time()
+    try:
+        r = await orch.asolve(p.prompt, p.tests)
+    except Exception as e:
+        # a failed request (e.g. a Groq 429) counts as unsolved for this
+        # model instead of aborting the whole comparison
+        console.print(f"  {p.task_id} ({name}): [red]{type(e).__name__}: {e}[/red]")
+        return {
+            "task_id": p.task_id,
+            "solved": False,
+            "attempts": 0,
+            "time": 0.0,
+            "wall_time": time.time() - t0,
+            "error": f"{type(e).__name__}: {e}"
+        }
+    elapsed = time.time() - t0
+    # wall time also counts waiting for a sandbox container and for the
+    # other model's work on the same problem, so the per-model figure only
+    # sums this model's own generation and test runs
+    work = sum(a.gen_time + a.exec_time for a in r.attempts)
+    
+    status = "✓" if r.solved else "✗"
+    console.print(f"  {p.task_id} ({name}): {status} ({len(r.attempts)} attempts)")
+    return {
+        "task_id": p.task_id,
+        "solved": r.solved,
+        "attempts": len(r.attempts),
+        "time": work,
+        "wall_time": elapsed
+    }
+
+
+async def _run_models(orchs: dict, problems, concurrency: int) -> dict:
+    # every problem goes to all models at once, so a latency spike on one
+    # provider doesn't leave the other idle
+    sem = asyncio.Semaphore(concurrency)
+    
+    async def one(p):
+        async with sem:
+            return await asyncio.gather(*[_solve_one(name, orch, p) for name, orch in orchs.items()])
+    
+    rows = await asyncio.gather(*[one(p) for p in problems])
+    return {name: [row[i] for row in rows] for i, name in enumerate(orchs)}
+
+
 def run_comparison(limit: int = 20, output_dir: str = "runs"):
     console.print("\n[bold]Model Comparison: Ollama vs Groq[/bold]\n")
     
     problems = load_humaneval(limit=limit)
     console.print(f"Loaded {len(problems)} problems\n")
     
-    sandbox = DockerSandbox()
+    # match the number of requests the ollama server will actually run at once
+    concurrency = int(os.environ.get("OLLAMA_NUM_PARALLEL", 8))
+    # both models run every problem at once, so each slot can hold two runs
+    sandbox = DockerSandbox(pool_size=2 * concurrency)
     
-    results = {"ollama": [], "groq": []}
-    
-    # run ollama
-    console.print("[cyan]Running Ollama (codellama:7b)...[/cyan]")
+    # both clients are built once and shared by every solve, then closed
+    # inside the same event loop that used their connections
     ollama = OllamaClient()
+    groq = GroqClient(rate_limiter=AsyncRateLimiter(GROQ_RATE_LIMIT, 60))
     orch_ollama = Orchestrator(llm=ollama, sandbox=sandbox, max_attempts=3)
-    
-    for p in problems:
-        t0 = time.time()
-        r = orch_ollama.solve(p.prompt, p.tests)
-        elapsed = time.time() - t0
-        
-        results["ollama"].append({
-            "task_id": p.task_id,
-            "solved": r.solved,
-            "attempts": len(r.attempts),
-            "time": elapsed
-        })
-        status = "✓" if r.solved else "✗"
-        console.print(f"  {p.task_id}: {status} ({len(r.attempts)} attempts)")
-    
-    # run groq
-    console.print("\n[cyan]Running Groq (llama-3.3-70b)...[/cyan]")
-    groq = GroqClient()
     orch_groq = Orchestrator(llm=groq, sandbox=sandbox, max_attempts=3)
     
-    for p in problems:
-        t0 = time.time()
-        r = orch_groq.solve(p.prompt, p.tests)
-        elapsed = time.time() - t0
-        
-        results["groq"].append({
-            "task_id": p.task_id,
-            "solved": r.solved,
-            "attempts": len(r.attempts),
-            "time": elapsed
-        })
-        status = "✓" if r.solved else "✗"
-        console.print(f"  {p.task_id}: {status} ({len(r.attempts)} attempts)")
-        
-        time.sleep(2)  # rate limit
+    async def run_both():
+        try:
+            console.print("[cyan]Running Ollama (codellama:7b) and Groq (llama-3.3-70b)...[/cyan]")
+            # the rate limiter paces groq requests, not a fixed sleep
+            return await _run_models({"ollama": orch_ollama, "groq": orch_groq}, problems, concurrency)
+        finally:
+            await ollama.aclose()
+            await groq.aclose()
+    
+    results = asyncio.run(run_both())
     
     # calc stats
     def calc_stats(data):
@@ -73,7 +105,8 @@ def run_comparison(limit: int = 20, output_dir: str = "runs"):
             "solved": solved,
             "pass_at_1": round(pass1 / n * 100, 1),
             "pass_at_3": round(solved / n * 100, 1),
-            "avg_time": round(sum(d["time"] for d in data) / n, 1)
+            "avg_time": round(sum(d["time"] for d in data) / n, 1),
+            "avg_wall_time": round(sum(d["wall_time"] for d in data) / n, 1)
         }
     
     ollama_stats = calc_stats(results["ollama"])
@@ -89,6 +122,7 @@ def run_comparison(limit: int = 20, output_dir: str = "runs"):
     table.add_row("Pass@1", f"{ollama_stats['pass_at_1']}%", f"{groq_stats['pass_at_1']}%")
     table.add_row("Pass@3", f"{ollama_stats['pass_at_3']}%", f"{groq_stats['pass_at_3']}%")
     table.add_row("Avg Time", f"{ollama_stats['avg_time']}s", f"{groq_stats['avg_time']}s")
+    table.add_row("Avg Wall Time", f"{ollama_stats['avg_wall_time']}s", f"{groq_stats['avg_wall_time']}s")
     
     o_imp = round((ollama_stats['pass_at_3'] - ollama_stats['pass_at_1']) / ollama_stats['pass_at_1'] * 100, 1) if ollama_stats['pass_at_1'] > 0 else 0
     g_imp = round((groq_stats['pass_at_3'] - groq_stats['pass_at_1']) / groq_stats['pass_at_1'] * 100, 1) if groq_stats['pass_at_1'] > 0 else 0
@@ -1,5 +1,5 @@
-from collections import Counter
 from typing import List, Dict
+import pandas as pd
 from ..loop.error_parser import ErrorCategory
 
 
@@ -9,62 +9,84 @@ def calculate_pass_at_k(results: List[dict], k: int) -> float:
 
 
 def calculate_error_distribution(results: List[dict]) -> Dict[str, int]:
-    errors = []
-    for r in results:
-        if "error_types" in r:
-            errors.extend(r["error_types"])
-    return dict(Counter(errors))
+    errors = pd.Series([e for r in results for e in r.get("error_types", [])], dtype=object)
+    return errors.value_counts(sort=False).to_dict()
 
 
 def calculate_fixability(results: List[dict]) -> Dict[str, dict]:
+    df = _to_frame(results)
+    if df.empty:
+        return {}
+    
     # group by first error type
-    by_error = {}
+    df = df[(df["error_types"].str.len() > 0) & (df["attempts"] >= 1)]
+    if df.empty:
+        return {}
     
-    for r in results:
-        if not r.get("error_types") or r["attempts"] < 1:
-            continue
-        
-        first_err = r["error_types"][0] if r["error_types"] else "UNKNOWN"
-        
-        if first_err not in by_error:
-            by_error[first_err] = {"total": 0, "fixed_1": 0, "fixed_2": 0}
-        
-        by_error[first_err]["total"] += 1
-        
-        if r["solved"]:
-            if r["attempts"] <= 2:
-                by_error[first_err]["fixed_1"] += 1
-            if r["attempts"] <= 3:
-                by_error[first_err]["fixed_2"] += 1
+    df = df.assign(
+        first_err=df["error_types"].str[0].fillna("UNKNOWN"),
+        fixed_1=df["solved"] & (df["attempts"] <= 2),
+        fixed_2=df["solved"] & (df["attempts"] <= 3),
+    )
+    grouped = df.groupby("first_err", sort=False).agg(
+        total=("solved", "size"),
+        fixed_1=("fixed_1", "sum"),
+        fixed_2=("fixed_2", "sum"),
+    )
     
     # calc rates
-    for err, data in by_error.items():
-        t = data["total"]
-        data["fix_rate_1"] = round(data["fixed_1"] / t * 100, 1) if t > 0 else 0
-        data["fix_rate_2"] = round(data["fixed_2"] / t * 100, 1) if t > 0 else 0
+    by_error = {}
+    for err, row in grouped.iterrows():
+        t, f1, f2 = int(row["total"]), int(row["fixed_1"]), int(row["fixed_2"])
+        by_error[err] = {
+            "total": t,
+            "fixed_1": f1,
+            "fixed_2": f2,
+            "fix_rate_1": round(f1 / t * 100, 1) if t > 0 else 0,
+            "fix_rate_2": round(f2 / t * 100, 1) if t > 0 else 0,
+        }
     
     return by_error
 
 
 def summary_stats(results: List[dict]) -> dict:
-    total = len(results)
-    solved = sum(1 for r in results if r["solved"])
+    df = _to_frame(results)
+    total = len(df)
+    if total == 0:
+        return {
+            "total": 0, "solved": 0, "solve_rate": 0, "avg_time": 0, "avg_attempts": 0,
+            "pass_at_1": 0, "pass_at_2": 0, "pass_at_3": 0,
+        }
     
-    times = [r["time"] for r in results]
-    attempts = [r["attempts"] for r in results]
+    solved = df["solved"]
+    attempts = df["attempts"]
+    pass_k = {k: int((solved & (attempts <= k)).sum()) for k in (1, 2, 3)}
+    n_solved = int(solved.sum())
     
     return {
         "total": total,
-        "solved": solved,
-        "solve_rate": round(solved / total * 100, 1) if total > 0 else 0,
-        "avg_time": round(sum(times) / total, 2) if total > 0 else 0,
-        "avg_attempts": round(sum(attempts) / total, 2) if total > 0 else 0,
-        "pass_at_1": round(calculate_pass_at_k(results, 1) * 100, 1),
-        "pass_at_2": round(calculate_pass_at_k(results, 2) * 100, 1),
-        "pass_at_3": round(calculate_pass_at_k(results, 3) * 100, 1),
+        "solved": n_solved,
+        "solve_rate": round(n_solved / total * 100, 1),
+        "avg_time": round(float(df["time"].mean()), 2),
+        "avg_attempts": round(float(attempts.mean()), 2),
+        "pass_at_1": round(pass_k[1] / total * 100, 1),
+        "pass_at_2": round(pass_k[2] / total * 100, 1),
+        "pass_at_3": round(pass_k[3] / total * 100, 1),
     }
 
 
+def _to_frame(results: List[dict]) -> pd.DataFrame:
+    # one column per field we aggregate on - boolean masks over these
+    # replace the per-row python loops
+    df = pd.DataFrame(results)
+    if df.empty:
+        return df
+    if "error_types" not in df:
+        df["error_types"] = [[] for _ in range(len(df))]
+    df["solved"] = df["solved"].astype(bool)
+    return df
+
+
 if __name__ == "__main__":
     # test with fake data
     fake_results = [
@@ -55,34 +55,38 @@ def generate_report(results_path: str, output_dir: str = "reports"):
     
     # save markdown report
     md_path = Path(output_dir) / "report.md"
-    with open(md_path, "w") as f:
-        f.write("# Evaluation Report\n\n")
-        f.write("## Summary\n\n")
-        f.write(f"- Total problems: {stats['total']}\n")
-        f.write(f"- Solved: {stats['solved']} ({stats['solve_rate']}%)\n")
-        f.write(f"- Pass@1: {stats['pass_at_1']}%\n")
-        f.write(f"- Pass@2: {stats['pass_at_2']}%\n")
-        f.write(f"- Pass@3: {stats['pass_at_3']}%\n")
-        f.write(f"- Avg time: {stats['avg_time']}s\n\n")
-        
-        if stats['pass_at_1'] > 0:
-            imp = ((stats['pass_at_3'] - stats['pass_at_1']) / stats['pass_at_1']) * 100
-            f.write(f"**Improvement from self-correction: {imp:.1f}%**\n\n")
-        
-        if errors:
-            f.write("## Error Distribution\n\n")
-            f.write("| Error Type | Count |\n")
-            f.write("|------------|-------|\n")
-            for err, count in sorted(errors.items(), key=lambda x: -x[1]):
-                f.write(f"| {err} | {count} |\n")
-            f.write("\n")
-        
-        if fixability:
-            f.write("## Fixability Analysis\n\n")
-            f.write("| Error Type | Total | Fixed (1 retry) | Fixed (2 retries) |\n")
-            f.write("|------------|-------|-----------------|-------------------|\n")
-            for err, d in fixability.items():
-                f.write(f"| {err} | {d['total']} | {d['fix_rate_1']}% | {d['fix_rate_2']}% |\n")
+    lines = [
+        "# Evaluation Report\n\n",
+        "## Summary\n\n",
+        f"- Total problems: {stats['total']}\n",
+        f"- Solved: {stats['solved']} ({stats['solve_rate']}%)\n",
+        f"- Pass@1: {stats['pass_at_1']}%\n",
+        f"- Pass@2: {stats['pass_at_2']}%\n",
+        f"- Pass@3: {stats['pass_at_3']}%\n",
+        f"- Avg time: {stats['avg_time']}s\n\n",
+    ]
+    
+    if stats['pass_at_1'] > 0:
+        imp = ((stats['pass_at_3'] - stats['pass_at_1']) / stats['pass_at_1']) * 100
+        lines.append(f"**Improvement from self-correction: {imp:.1f}%**\n\n")
+    
+    if errors:
+        lines.append("## Error Distribution\n\n")
+        lines.append("| Error Type | Count |\n")
+        lines.append("|------------|-------|\n")
+        for err, count in sorted(errors.items(), key=lambda x: -x[1]):
+            lines.append(f"| {err} | {count} |\n")
+        lines.append("\n")
+    
+    if fixability:
+        lines.append("## Fixability Analysis\n\n")
+        lines.append("| Error Type | Total | Fixed (1 retry) | Fixed (2 retries) |\n")
+        lines.append("|------------|-------|-----------------|-------------------|\n")
+        for err, d in fixability.items():
+            lines.append(f"| {err} | {d['total']} | {d['fix_rate_1']}% | {d['fix_rate_2']}% |\n")
+    
+    # built up in memory, written in one go
+    md_path.write_text("".join(lines))
     
     console.print(f"\n[green]Report saved to {md_path}[/green]")
 
@@ -1,8 +1,12 @@
+import gc
 import time
 import json
+import asyncio
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
-from dataclasses import asdict
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
@@ -10,6 +14,7 @@ from rich.table import Table
 
 from .benchmarks import Problem, load_humaneval, load_mbpp, load_all
 from ..loop.orchestrator import Orchestrator, SolutionResult
+from ..sandbox.docker_runner import DockerSandbox
 
 import yaml
 
@@ -30,58 +35,150 @@ def run_evaluation(
 ) -> dict:
     
     orch = Orchestrator(max_attempts=max_attempts)
-    results = []
-    
-    pass_at_1 = 0
-    pass_at_2 = 0
-    pass_at_3 = 0
-    total_time = 0
+    outcomes = []
+    wall_t0 = time.time()
     
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         TaskProgressColumn(),
-        console=console
+        console=console,
+        refresh_per_second=4,
+        transient=True
     ) as progress:
         
         task = progress.add_task("Running evaluation...", total=len(problems))
         
-        for p in problems:
-            progress.update(task, description=f"[cyan]{p.task_id}[/cyan]")
-            
+        with _gc_paused():
+            for i, p in enumerate(problems):
+                # the bar redraws on its own timer - only touch the label now and then
+                if i % 10 == 0:
+                    progress.update(task, description=f"[cyan]{p.task_id}[/cyan]")
+                
+                t0 = time.time()
+                result = orch.solve(p.prompt, p.tests)
+                # keep the raw result, the json projection happens once at the end
+                outcomes.append((result, time.time() - t0))
+                
+                progress.advance(task)
+    
+    return _build_output(problems, outcomes, time.time() - wall_t0, save_path)
+
+
+async def run_evaluation_async(
+    problems: List[Problem],
+    max_attempts: int = 3,
+    save_path: Optional[str] = None,
+    concurrency: int = 8
+) -> dict:
+    # solves up to `concurrency` problems at once - each solve mostly waits
+    # on the LLM, so this keeps the server busy instead of idle between calls.
+    # start ollama with OLLAMA_NUM_PARALLEL >= concurrency or requests just queue
+    #
+    # all problems share one semaphore and are started longest first (by
+    # estimated prompt length), so the slow generations don't end up as a
+    # tail running alone while every other slot sits idle
+    
+    # one pooled sandbox container per in-flight solve
+    orch = Orchestrator(max_attempts=max_attempts, sandbox=DockerSandbox(pool_size=concurrency))
+    wall_t0 = time.time()
+    
+    sem = asyncio.Semaphore(concurrency)
+    
+    async def bounded(p: Problem):
+        async with sem:
             t0 = time.time()
-            result = orch.solve(p.prompt, p.tests)
-            elapsed = time.time() - t0
-            total_time += elapsed
-            
-            # track pass@k
-            if result.solved:
-                n = len(result.attempts)
-                if n <= 1:
-                    pass_at_1 += 1
-                if n <= 2:
-                    pass_at_2 += 1
-                if n <= 3:
-                    pass_at_3 += 1
-            
-
-            error_types = []
-            for att in result.attempts:
-                if att.error:
-                    error_types.append(att.error.category.value)
+            try:
+                result = await orch.asolve(p.prompt, p.tests)
+            except Exception as e:
+                # one failed solve (connection drop, rate limit) is recorded
+                # as an ERROR result instead of taking the whole run down
+                console.print(f"[red]{p.task_id}: {type(e).__name__}: {e}[/red]")
+                result = SolutionResult(status="ERROR", attempts=[], total_time=time.time() - t0)
+            return result, time.time() - t0
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        console=console,
+        refresh_per_second=4,
+        transient=True
+    ) as progress:
+        
+        task = progress.add_task(f"Running evaluation ({concurrency} at a time)...", total=len(problems))
+        
+        order = _longest_first(problems)
+        outcomes = [None] * len(problems)
+        
+        with _gc_paused():
+            try:
+                # tasks wait on the semaphore in creation order, so this is
+                # the order they start in
+                tasks = []
+                for i in order:
+                    t = asyncio.ensure_future(bounded(problems[i]))
+                    t.add_done_callback(lambda _: progress.advance(task))
+                    tasks.append(t)
                 
-            results.append({
-                "task_id": p.task_id,
-                "source": p.source,
-                "status": result.status,
-                "attempts": len(result.attempts),
-                "time": elapsed,
-                "solved": result.solved,
-                "error_types": error_types
-            })
-            
-            progress.advance(task)
+                for i, outcome in zip(order, await asyncio.gather(*tasks)):
+                    outcomes[i] = outcome
+            finally:
+                await orch.llm.aclose()
+    
+    return _build_output(problems, outcomes, time.time() - wall_t0, save_path)
+
+
+@contextmanager
+def _gc_paused():
+    # the solve loop is I/O bound and makes few reference cycles, so a
+    # collection pause there only stalls in-flight solves - collect once after
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+            gc.collect()
+
+
+def _estimate_tokens(p: Problem) -> int:
+    # ~4 chars per token for the prompt, plus the 512-token completion budget
+    return len(p.prompt) // 4 + len(p.tests) // 4 + 512
+
+
+def _longest_first(problems: List[Problem]) -> List[int]:
+    # indexes into problems, longest estimated prompt first
+    return sorted(range(len(problems)), key=lambda i: _estimate_tokens(problems[i]), reverse=True)
+
+
+def _build_output(
+    problems: List[Problem],
+    outcomes: List[Tuple[SolutionResult, float]],
+    wall_time: float,
+    save_path: Optional[str] = None
+) -> dict:
+    results = []
+    total_time = 0
+    
+    for p, (result, elapsed) in zip(problems, outcomes):
+        total_time += elapsed
+        results.append({
+            "task_id": p.task_id,
+            "source": p.source,
+            "status": result.status,
+            "attempts": len(result.attempts),
+            "time": elapsed,
+            "solved": result.solved,
+            "error_types": [a.error.category.value for a in result.attempts if a.error]
+        })
+    
+    # pass@k from one array of attempt counts instead of branching per problem
+    solved_attempts = np.fromiter((r["attempts"] for r in results if r["solved"]), dtype=np.int32)
+    pass_at_1, pass_at_2, pass_at_3 = (int((solved_attempts <= k).sum()) for k in (1, 2, 3))
     
     n = len(problems)
     metrics = {
@@ -93,7 +190,8 @@ def run_evaluation(
         "pass_at_2_pct": round(pass_at_2 / n * 100, 1),
         "pass_at_3_pct": round(pass_at_3 / n * 100, 1),
         "total_time": round(total_time, 1),
-        "avg_time": round(total_time / n, 1)
+        "avg_time": round(total_time / n, 1),
+        "wall_time": round(wall_time, 1)
     }
     
     output = {"metrics": metrics, "results": results}
@@ -119,6 +217,8 @@ def print_summary(data: dict):
     table.add_row("Pass@2", f"{m['pass_at_2']} ({m['pass_at_2_pct']}%)")
     table.add_row("Pass@3", f"{m['pass_at_3']} ({m['pass_at_3_pct']}%)")
     table.add_row("Total time", f"{m['total_time']}s")
+    if "wall_time" in m:
+        table.add_row("Wall time", f"{m['wall_time']}s")
     table.add_row("Avg time/problem", f"{m['avg_time']}s")
     
     console.print(table)
@@ -137,6 +237,8 @@ if __name__ == "__main__":
     parser.add_argument("--limit", type=int, default=None, help="limit problems to run")
     parser.add_argument("--attempts", type=int, default=3)
     parser.add_argument("--output", type=str, default=None, help="save results to json")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="problems solved at once; >1 overlaps LLM generation with sandbox runs")
     
     args = parser.parse_args()
     
@@ -151,5 +253,8 @@ if __name__ == "__main__":
     
     console.print(f"Loaded {len(problems)} problems\n")
     
-    data = run_evaluation(problems, args.attempts, args.output)
+    if args.concurrency > 1:
+        data = asyncio.run(run_evaluation_async(problems, args.attempts, args.output, args.concurrency))
+    else:
+        data = run_evaluation(problems, args.attempts, args.output)
     print_summary(data)
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Exact-match response cache for the LLM clients, stored in sqlite.
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import functools
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+CACHE_PATH = Path(".llm_cache") / "responses.sqlite"
+
+
+def cache_enabled(temperature: float) -> bool:
+    # sampled outputs differ run to run, so only cache greedy decoding unless
+    # asked to - LLM_CACHE=1 forces it on (handy for dev/CI replays), 0 off
+    flag = os.environ.get("LLM_CACHE")
+    if flag is not None:
+        return flag != "0"
+    return temperature == 0
+
+
+def cache_key(**parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+class ResponseCache:
+    # one row per (model, settings, prompt) hash holding the result as json
+
+    def __init__(self, path: Path = CACHE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # shared with the worker threads asolve falls back to, hence the lock
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: dict):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?)", (key, json.dumps(value)))
+            self._conn.commit()
+
+
+def cached_generation(result_cls):
+    # wraps a client's generate/agenerate(prompt). the client provides
+    # self.cache (None = disabled) and self._cache_key(prompt)
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(self, prompt: str):
+                if self.cache is None:
+                    return await fn(self, prompt)
+                key = self._cache_key(prompt)
+                hit = self.cache.get(key)
+                if hit is not None:
+                    return result_cls(**hit)
+                result = await fn(self, prompt)
+                self.cache.put(key, asdict(result))
+                return result
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, prompt: str):
+            if self.cache is None:
+                return fn(self, prompt)
+            key = self._cache_key(prompt)
+            hit = self.cache.get(key)
+            if hit is not None:
+                return result_cls(**hit)
+            result = fn(self, prompt)
+            self.cache.put(key, asdict(result))
+            return result
+        return wrapper
+    return decorate
@@ -1,11 +1,14 @@
 import os
-import re
 import time
+import httpx
+from dataclasses import dataclass
 from typing import Optional
-from pydantic import BaseModel
 
+from .cache import ResponseCache, cache_enabled, cache_key, cached_generation
 
-class GenerationResult(BaseModel):
+
+@dataclass(slots=True)
+class GenerationResult:
     code: str
     raw_response: str
     generation_time: float
@@ -13,52 +16,163 @@ class GenerationResult(BaseModel):
     completion_tokens: Optional[int] = None
 
 
+def _fenced_block(text: str) -> Optional[str]:
+    # body of the first non-empty ``` block whose opening fence starts a
+    # line - inline ```x``` in chatty prose is skipped. None if there's none
+    pos = 0
+    while True:
+        if pos == 0 and text.startswith("```"):
+            i = 0
+        else:
+            i = text.find("\n```", max(pos - 1, 0))
+            if i < 0:
+                return None
+            i += 1
+        j = text.find("\n", i) + 1
+        k = text.find("```", j) if j else -1
+        if k < 0:
+            return None
+        code = text[j:k].strip()
+        if code:
+            return code
+        pos = k + 3
+
+
+def _block_closed(text: str) -> bool:
+    # the first code block is all we extract, so anything after it is wasted
+    return "[/PYTHON]" in text or _fenced_block(text) is not None
+
+
 class GroqClient:
     
-    def __init__(self, model: str = "llama-3.3-70b-versatile", api_key: str = None):
-        from groq import Groq
+    def __init__(self, model: str = "llama-3.3-70b-versatile", api_key: str = None,
+                 rate_limiter=None, stream: bool = True, cache: Optional[bool] = None):
+        from groq import Groq, AsyncGroq, DefaultAioHttpClient
         self.model = model
-        self.client = Groq(api_key=api_key or os.environ.get("GROQ_API_KEY"))
+        self.temperature = 0.2
+        self.max_tokens = 512
+        api_key = api_key or os.environ.get("GROQ_API_KEY")
+        self.client = Groq(api_key=api_key)
+        # aiohttp handles many parallel requests better than the default
+        # httpx transport; it needs the groq[aiohttp] extra
+        try:
+            http_client = DefaultAioHttpClient()
+        except RuntimeError:
+            http_client = None
+        self.aclient = AsyncGroq(api_key=api_key, http_client=http_client)
+        # optional AsyncRateLimiter shared by every agenerate call
+        self.rate_limiter = rate_limiter
+        # stream and hang up once the first code block closes
+        self.stream = stream
+        # exact-match response cache, see cache_enabled() for the default
+        if cache is None:
+            cache = cache_enabled(self.temperature)
+        self.cache = ResponseCache() if cache else None
+        self._available: Optional[bool] = None
     
+    @cached_generation(GenerationResult)
     def generate(self, prompt: str) -> GenerationResult:
         t0 = time.time()
         
-        response = self.client.chat.completions.create(
+        if not self.stream:
+            response = self.client.chat.completions.create(**self._request(prompt))
+            return self._to_result(response.choices[0].message.content, time.time() - t0, response.usage)
+        
+        stream = self.client.chat.completions.create(**self._request(prompt), stream=True)
+        raw, usage = "", None
+        try:
+            for chunk in stream:
+                raw, usage = self._add_chunk(raw, usage, chunk)
+                if _block_closed(raw):
+                    break
+        finally:
+            stream.close()
+        
+        return self._to_result(raw, time.time() - t0, usage)
+    
+    @cached_generation(GenerationResult)
+    async def agenerate(self, prompt: str) -> GenerationResult:
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        
+        t0 = time.time()
+        
+        if not self.stream:
+            response = await self.aclient.chat.completions.create(**self._request(prompt))
+            return self._to_result(response.choices[0].message.content, time.time() - t0, response.usage)
+        
+        stream = await self.aclient.chat.completions.create(**self._request(prompt), stream=True)
+        raw, usage = "", None
+        try:
+            async for chunk in stream:
+                raw, usage = self._add_chunk(raw, usage, chunk)
+                if _block_closed(raw):
+                    break
+        finally:
+            await stream.close()
+        
+        return self._to_result(raw, time.time() - t0, usage)
+    
+    async def aclose(self):
+        await self.aclient.close()
+    
+    def _request(self, prompt: str) -> dict:
+        return dict(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=512
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
         )
-        
-        gen_time = time.time() - t0
-        raw = response.choices[0].message.content
+    
+    def _cache_key(self, prompt: str) -> str:
+        # streamed responses are cut at the first closed code block
+        return cache_key(m=self.model, t=self.temperature, n=self.max_tokens, s=self.stream, p=prompt)
+    
+    def _add_chunk(self, raw: str, usage, chunk):
+        if chunk.choices:
+            raw += chunk.choices[0].delta.content or ""
+        # groq only reports usage on the last chunk, which we miss if we stop early
+        if chunk.x_groq and chunk.x_groq.usage:
+            usage = chunk.x_groq.usage
+        return raw, usage
+    
+    def _to_result(self, raw: str, gen_time: float, usage=None) -> GenerationResult:
         code = self._extract_code(raw)
         
         return GenerationResult(
             code=code,
             raw_response=raw,
             generation_time=gen_time,
-            prompt_tokens=response.usage.prompt_tokens,
-            completion_tokens=response.usage.completion_tokens
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None
         )
     
     def _extract_code(self, response: str) -> str:
-        md = re.findall(r"```(?:python)?\n(.*?)```", response, re.DOTALL)
-        if md:
-            return md[0].strip()
+        # one fenced block is the common case - slice it out with str.find
+        code = _fenced_block(response)
+        if code is not None:
+            return code
         
-        py = re.findall(r"\[PYTHON\]\n?(.*?)\[/PYTHON\]", response, re.DOTALL)
-        if py:
-            return py[0].strip()
+        # an unterminated tag isn't sliced to the end, same as the old regex
+        start = response.find("[PYTHON]")
+        if start >= 0:
+            end = response.find("[/PYTHON]", start)
+            if end >= 0:
+                return response[start + len("[PYTHON]"):end].strip()
         
         return response.strip()
     
     def is_available(self) -> bool:
-        try:
-            self.client.models.list()
-            return True
-        except:
-            return False
+        # models.list() is a full round trip and the answer doesn't change
+        # while we run, so check once per client
+        if self._available is None:
+            from groq import APIError
+            try:
+                self.client.models.list()
+                self._available = True
+            except (APIError, httpx.HTTPError):
+                self._available = False
+        return self._available
 
 
 if __name__ == "__main__":
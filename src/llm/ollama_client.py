@@ -1,12 +1,17 @@
 # Ollama Client - Communicates with local Ollama server to generate code.
 
-import requests
-import re
+import time
+
+import httpx
+import orjson
+from dataclasses import dataclass
 from typing import Optional
-from pydantic import BaseModel
+
+from .cache import ResponseCache, cache_enabled, cache_key, cached_generation
 
 
-class GenerationResult(BaseModel):
+@dataclass(slots=True)
+class GenerationResult:
     # Result from a code generation request.
     code: str
     raw_response: str
@@ -15,6 +20,41 @@ class GenerationResult(BaseModel):
     completion_tokens: Optional[int] = None
 
 
+# line starts that mark the beginning of code in an unformatted response
+# same for sync and async calls - a hung stream must not hold its slot in
+# solve_many / run_evaluation_async forever
+_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+
+_CODE_PREFIXES = ('#', 'def ', 'class ', 'import ', 'from ', 'return ', 'if ', 'for ', 'while ')
+
+
+def _fenced_block(text: str) -> Optional[str]:
+    # body of the first non-empty ``` block whose opening fence starts a
+    # line - inline ```x``` in chatty prose is skipped. None if there's none
+    pos = 0
+    while True:
+        if pos == 0 and text.startswith("```"):
+            i = 0
+        else:
+            i = text.find("\n```", max(pos - 1, 0))
+            if i < 0:
+                return None
+            i += 1
+        j = text.find("\n", i) + 1
+        k = text.find("```", j) if j else -1
+        if k < 0:
+            return None
+        code = text[j:k].strip()
+        if code:
+            return code
+        pos = k + 3
+
+
+def _block_closed(text: str) -> bool:
+    # true once the first code block is complete - that's all we extract
+    return "[/PYTHON]" in text or _fenced_block(text) is not None
+
+
 class OllamaClient:
     # Client for interacting with Ollama API.
     
@@ -24,14 +64,34 @@ class OllamaClient:
         base_url: str = "http://localhost:11434",
         temperature: float = 0.2,
         top_p: float = 0.9,
-        max_tokens: int = 512
+        max_tokens: int = 512,
+        stream: bool = True,
+        cache: Optional[bool] = None
     ):
         self.model = model
         self.base_url = base_url
         self.temperature = temperature
         self.top_p = top_p
         self.max_tokens = max_tokens
+        # stream tokens and hang up once the first code block closes -
+        # everything after it is explanation we throw away anyway
+        self.stream = stream
+        # one pooled client for every sync call, so repeat attempts reuse a
+        # warm keep-alive connection instead of reconnecting each time
+        self._session = httpx.Client(
+            base_url=base_url,
+            timeout=_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0)
+        )
+        # exact-match response cache, on by default only for greedy decoding
+        if cache is None:
+            cache = cache_enabled(temperature)
+        self.cache = ResponseCache() if cache else None
+        # created on first agenerate() and reused by every call after it, so
+        # concurrent solves share warm keep-alive connections
+        self._aclient: Optional[httpx.AsyncClient] = None
     
+    @cached_generation(GenerationResult)
     def generate(self, prompt: str) -> GenerationResult:
         """
         Generate code from a prompt.
@@ -42,29 +102,114 @@ class OllamaClient:
         Returns:
             GenerationResult with extracted code and metadata
         """
-        import time
+        start_time = time.time()
+        
+        if not self.stream:
+            response = self._session.post("/api/generate", json=self._payload(prompt))
+            response.raise_for_status()
+            return self._to_result(orjson.loads(response.content), time.time() - start_time)
+        
+        data = {}
+        with self._session.stream("POST", "/api/generate", json=self._payload(prompt)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = self._add_chunk(data, orjson.loads(line))
+                if data["done"] or _block_closed(data["response"]):
+                    break
+        
+        generation_time = time.time() - start_time
+        
+        return self._to_result(data, generation_time)
+    
+    @cached_generation(GenerationResult)
+    async def agenerate(self, prompt: str) -> GenerationResult:
+        """
+        Async version of generate() so several prompts can be in flight
+        at once. The server only works on them in parallel if it was
+        started with OLLAMA_NUM_PARALLEL > 1.
+        """
+        start_time = time.time()
+        client = self._async_client()
+        
+        if not self.stream:
+            response = await client.post("/api/generate", json=self._payload(prompt))
+            response.raise_for_status()
+            return self._to_result(orjson.loads(response.content), time.time() - start_time)
+        
+        data = {}
+        async with client.stream("POST", "/api/generate", json=self._payload(prompt)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = self._add_chunk(data, orjson.loads(line))
+                if data["done"] or _block_closed(data["response"]):
+                    break
         
-        url = f"{self.base_url}/api/generate"
+        generation_time = time.time() - start_time
         
-        payload = {
+        return self._to_result(data, generation_time)
+    
+    def embed(self, text: str, model: str = "nomic-embed-text") -> list:
+        """Embed text with an Ollama embedding model over the pooled session."""
+        response = self._session.post("/api/embeddings", json={"model": model, "prompt": text})
+        response.raise_for_status()
+        return orjson.loads(response.content)["embedding"]
+    
+    async def aembed(self, text: str, model: str = "nomic-embed-text") -> list:
+        response = await self._async_client().post("/api/embeddings", json={"model": model, "prompt": text})
+        response.raise_for_status()
+        return orjson.loads(response.content)["embedding"]
+    
+    def close(self):
+        """Close the pooled sync connections."""
+        self._session.close()
+    
+    async def aclose(self):
+        """Close the pooled async connections. Call from the event loop that used them."""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+    
+    def _async_client(self) -> httpx.AsyncClient:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=_TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+            )
+        return self._aclient
+    
+    def _cache_key(self, prompt: str) -> str:
+        # a streamed response stops at the first closed code block, so it is
+        # cached apart from a complete one
+        return cache_key(m=self.model, t=self.temperature, top_p=self.top_p, n=self.max_tokens, s=self.stream, p=prompt)
+    
+    def _payload(self, prompt: str) -> dict:
+        return {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": self.stream,
             "options": {
                 "temperature": self.temperature,
                 "top_p": self.top_p,
                 "num_predict": self.max_tokens
             }
         }
-        
-        start_time = time.time()
-        
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        
-        generation_time = time.time() - start_time
-        
-        data = response.json()
+    
+    def _add_chunk(self, data: dict, chunk: dict) -> dict:
+        # the final chunk carries the token counts; if we stop early we only
+        # have the chunk count, which is one token per chunk in ollama
+        return {
+            "response": data.get("response", "") + chunk.get("response", ""),
+            "done": chunk.get("done", False),
+            "prompt_eval_count": chunk.get("prompt_eval_count"),
+            "eval_count": chunk.get("eval_count", data.get("eval_count", 0) + 1),
+        }
+    
+    def _to_result(self, data: dict, generation_time: float) -> GenerationResult:
         raw_response = data.get("response", "")
         
         # Extract code from response
@@ -83,17 +228,19 @@ class OllamaClient:
         Extract Python code from the model's response.
         Handles various formats: markdown blocks, [PYTHON] tags, or raw code.
         """
-        # Try to extract from markdown code blocks
-        markdown_pattern = r"```(?:python)?\n(.*?)```"
-        matches = re.findall(markdown_pattern, response, re.DOTALL)
-        if matches:
-            return matches[0].strip()
-        
-        # Try to extract from [PYTHON] tags (Codellama format)
-        python_tag_pattern = r"\[PYTHON\]\n?(.*?)\[/PYTHON\]"
-        matches = re.findall(python_tag_pattern, response, re.DOTALL)
-        if matches:
-            return matches[0].strip()
+        # Try to extract from markdown code blocks - a few str.find calls,
+        # no regex
+        code = _fenced_block(response)
+        if code is not None:
+            return code
+        
+        # Try to extract from [PYTHON] tags (Codellama format). without the
+        # closing tag this falls through to the line scan, like the old regex
+        start = response.find("[PYTHON]")
+        if start >= 0:
+            end = response.find("[/PYTHON]", start)
+            if end >= 0:
+                return response[start + len("[PYTHON]"):end].strip()
         
         # If no special formatting, return the response as-is
         # but try to clean it up
@@ -102,12 +249,11 @@ class OllamaClient:
         in_code = False
         
         for line in lines:
-            # Skip obvious non-code lines
-            if line.strip().startswith(('#', 'def ', 'class ', 'import ', 'from ', 'return ', 'if ', 'for ', 'while ')):
+            # Skip obvious non-code lines until the first one that looks like code
+            if not in_code and line.lstrip().startswith(_CODE_PREFIXES):
                 in_code = True
-            if in_code or line.strip().startswith(('def ', 'class ', 'import ', 'from ')):
+            if in_code:
                 code_lines.append(line)
-                in_code = True
         
         if code_lines:
             return '\n'.join(code_lines).strip()
@@ -117,13 +263,13 @@ class OllamaClient:
     def is_available(self) -> bool:
         """Check if Ollama server is running and model is available."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self._session.get("/api/tags")
             if response.status_code == 200:
-                models = response.json().get("models", [])
+                models = orjson.loads(response.content).get("models", [])
                 model_names = [m.get("name", "") for m in models]
                 return self.model in model_names
             return False
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             return False
 
 
@@ -3,9 +3,9 @@ Prompts for code gen and repair.
 """
 
 
-GENERATION_PROMPT = """Write a Python function to solve this problem. Return ONLY the code.
-
-{problem_description}
+# static instructions first and the problem last, so every generation prompt
+# starts with the same bytes and the server can reuse its cached prefix
+GENERATION_PREFIX = """Write a Python function to solve this problem. Return ONLY the code.
 
 Rules:
 - Complete the function
@@ -14,6 +14,16 @@ Rules:
 - Just the function, nothing else
 """
 
+GENERATION_PROMPT = GENERATION_PREFIX + """
+---
+PROBLEM:
+{problem_description}
+"""
+
+
+# split once at import so building a prompt is plain concatenation
+_GEN_PREFIX, _GEN_SUFFIX = GENERATION_PROMPT.split("{problem_description}")
+
 
 def build_generation_prompt(problem_desc: str) -> str:
-    return GENERATION_PROMPT.format(problem_description=problem_desc)
\ No newline at end of file
+    return f"{_GEN_PREFIX}{problem_desc}{_GEN_SUFFIX}"
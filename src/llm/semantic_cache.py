@@ -0,0 +1,57 @@
+"""
+Semantic response cache - reuses a generation when a new prompt embeds
+close enough to one already answered.
+"""
+
+from typing import Optional, Any
+
+import numpy as np
+
+
+class SemanticCache:
+    # sits in front of the exact-match cache: prompts that only differ in
+    # whitespace or phrasing land within `threshold` cosine similarity of
+    # each other and share one generation. embedding is a single forward pass
+    # of a small model, far cheaper than decoding a completion.
+    #
+    # `embedder` is anything with embed(text)/aembed(text) returning a vector,
+    # normally an OllamaClient so the embeddings go over its pooled connection
+
+    def __init__(self, embedder, threshold: float = 0.92, model: str = "nomic-embed-text"):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.model = model
+        self._vecs: Optional[np.ndarray] = None   # unit-norm rows
+        self._results: list = []
+
+    def lookup(self, prompt: str):
+        # returns (cached result or None, embedding) - pass the embedding
+        # back to add() on a miss so the prompt isn't embedded twice
+        vec = self._normalize(self.embedder.embed(prompt, model=self.model))
+        return self._nearest(vec), vec
+
+    async def alookup(self, prompt: str):
+        vec = self._normalize(await self.embedder.aembed(prompt, model=self.model))
+        return self._nearest(vec), vec
+
+    def add(self, vec: np.ndarray, result: Any):
+        row = vec[None, :]
+        self._vecs = row if self._vecs is None else np.vstack([self._vecs, row])
+        self._results.append(result)
+
+    def __len__(self):
+        return len(self._results)
+
+    def _nearest(self, vec: np.ndarray):
+        if self._vecs is None:
+            return None
+        # rows are unit vectors, so the dot product is the cosine similarity
+        scores = self._vecs @ vec
+        best = int(scores.argmax())
+        return self._results[best] if scores[best] >= self.threshold else None
+
+    @staticmethod
+    def _normalize(vec) -> np.ndarray:
+        vec = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
@@ -3,8 +3,9 @@ Error Parser - Analyzes pytest output and classifies errors.
 """
 
 import re
+from functools import lru_cache
+from dataclasses import dataclass, field
 from typing import List, Optional
-from pydantic import BaseModel
 from enum import Enum
 
 
@@ -19,16 +20,21 @@ class ErrorCategory(str, Enum):
     OTHER = "OTHER"             # Unclassified errors
 
 
-class ErrorInfo(BaseModel):
+# frozen: parse_pytest_output is cached, so every caller that parses the
+# same output shares one instance
+@dataclass(frozen=True, slots=True)
+class ErrorInfo:
     """Structured information about an error."""
     category: ErrorCategory
     error_type: str                          # e.g., "SyntaxError", "AssertionError"
     message: str                             # The error message
     line_number: Optional[int] = None        # Line where error occurred
-    failing_tests: List[str] = []            # Names of failing tests
+    failing_tests: List[str] = field(default_factory=list)  # Names of failing tests
     traceback: str = ""                      # Full traceback
     fixable_probability: float = 0.5         # Estimated probability of fixing
     expected_vs_actual: Optional[dict] = None # Expected vs actual values
+    # summarize_error() result, filled on first call
+    _summary: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def signature(self) -> str:
@@ -79,6 +85,35 @@ FIXABILITY_RATES = {
 }
 
 
+# Compiled once at import - these run over every failing test output
+
+# Pattern: "ErrorType: message" or "E   ErrorType: message"
+_ERROR_TYPE_RE = re.compile(r"(?:^|E\s+)(\w+(?:Error|Exception))\s*:", re.MULTILINE)
+
+# Pattern: "solution.py:123", 'solution.py", line 123' or "line 123"
+_LINE_NUMBER_RE = re.compile(
+    r"(?:solution\.py[\"']?[:,]\s*(?:line\s*)?|line\s+|File.*line\s+)(\d+)",
+    re.IGNORECASE
+)
+
+_ASSERT_RE = re.compile(r"assert\s+(.+)")
+_E_ASSERT_RE = re.compile(r"E\s+assert\s+(.+)")
+_FAILED_TEST_RE = re.compile(r"FAILED\s+\S+::(\w+)")
+_TEST_HEADER_RE = re.compile(r"_{3,}\s*(\w+)\s*_{3,}")
+
+# pytest's "E   assert X == Y" line, optionally followed (after any other E
+# lines) by the "E    +  where X = func(args)" line that names the input
+_EXPECTED_ACTUAL_RE = re.compile(
+    r"^E\s+(?:AssertionError:\s*)?assert\s+(?P<actual>.+?)\s*==\s*(?P<expected>.+?)[ \t]*$"
+    r"(?:(?:\nE[^\n]*)*?\nE\s+\+\s+where\s+.+?=\s*\w+\((?P<input>.+)\))?",
+    re.MULTILINE
+)
+
+
+# identical output (same buggy code resubmitted, or the same failure across
+# runs) skips the regex pipeline. callers get the cached ErrorInfo itself,
+# so treat it as read-only
+@lru_cache(maxsize=128)
 def parse_pytest_output(stdout: str, stderr: str, timeout_occurred: bool = False) -> ErrorInfo:
     """
     Parse pytest output and extract structured error information.
@@ -91,8 +126,6 @@ def parse_pytest_output(stdout: str, stderr: str, timeout_occurred: bool = False
     Returns:
         ErrorInfo with classified error details
     """
-    combined = stdout + "\n" + stderr
-    
     # Handle timeout
     if timeout_occurred:
         return ErrorInfo(
@@ -102,18 +135,22 @@ def parse_pytest_output(stdout: str, stderr: str, timeout_occurred: bool = False
             fixable_probability=FIXABILITY_RATES[ErrorCategory.TIMEOUT]
         )
     
+    # the helpers scan stdout then stderr instead of one joined copy - pytest
+    # writes nearly everything to stdout, so stderr is usually empty
+    chunks = (stdout, stderr) if stderr else (stdout,)
+    
     # Extract error type from traceback
-    error_type = _extract_error_type(combined)
+    error_type = _extract_error_type(*chunks)
     category = ERROR_CATEGORY_MAP.get(error_type, ErrorCategory.OTHER)
     
     # Extract line number
-    line_number = _extract_line_number(combined)
+    line_number = _extract_line_number(*chunks)
     
     # Extract error message
-    message = _extract_error_message(combined, error_type)
+    message = _extract_error_message(error_type, *chunks)
     
     # Extract failing test names
-    failing_tests = _extract_failing_tests(combined)
+    failing_tests = _extract_failing_tests(*chunks)
     
     # Get fixability probability
     fixable_probability = FIXABILITY_RATES.get(category, 0.4)
@@ -124,110 +161,99 @@ def parse_pytest_output(stdout: str, stderr: str, timeout_occurred: bool = False
         message=message,
         line_number=line_number,
         failing_tests=failing_tests,
-        traceback=combined,
+        traceback=f"{stdout}\n{stderr}" if stderr else stdout,
         fixable_probability=fixable_probability,
-        expected_vs_actual=_get_expected_actual(combined)
+        expected_vs_actual=_get_expected_actual(*chunks)
     )
 
 
-def _extract_error_type(output: str) -> str:
-    """Extract the Python exception type from output."""
-    # Pattern: "ErrorType: message" or "E   ErrorType: message"
-    patterns = [
-        r"E\s+(\w+Error):",
-        r"E\s+(\w+Exception):",
-        r"^(\w+Error):",
-        r"^(\w+Exception):",
-        r"(\w+Error): ",
-        r"(\w+Exception): ",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, output, re.MULTILINE)
+def _search(pattern: re.Pattern, chunks: tuple) -> Optional[re.Match]:
+    """First match of pattern across the output chunks, in order."""
+    for chunk in chunks:
+        match = pattern.search(chunk)
         if match:
-            return match.group(1)
+            return match
+    return None
+
+
+def _extract_error_type(*chunks: str) -> str:
+    """Extract the Python exception type from output."""
+    # one pass over the traceback instead of a search per pattern
+    match = _search(_ERROR_TYPE_RE, chunks)
+    if match:
+        return match.group(1)
     
     # Check for assertion failures specifically
-    if "assert " in output.lower() and ("AssertionError" in output or "assert" in output):
+    if any("assert " in chunk.lower() and ("AssertionError" in chunk or "assert" in chunk) for chunk in chunks):
         return "AssertionError"
     
     return "UnknownError"
 
 
-def _extract_line_number(output: str) -> Optional[int]:
+def _extract_line_number(*chunks: str) -> Optional[int]:
     """Extract the line number where error occurred."""
-    # Pattern: "solution.py:123" or "line 123"
-    patterns = [
-        r"solution\.py[\"']?,\s*line\s*(\d+)",
-        r"solution\.py:(\d+)",
-        r"line\s+(\d+)",
-        r"File.*line\s+(\d+)",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, output, re.IGNORECASE)
-        if match:
-            return int(match.group(1))
-    
-    return None
+    match = _search(_LINE_NUMBER_RE, chunks)
+    return int(match.group(1)) if match else None
+
 
+@lru_cache(maxsize=64)
+def _message_re(error_type: str) -> re.Pattern:
+    # "ErrorType: message" for the type found in the output - one pattern
+    # per exception type, built the first time that type shows up
+    return re.compile(rf"{re.escape(error_type)}:\s*(.+)")
 
-def _extract_error_message(output: str, error_type: str) -> str:
+
+def _extract_error_message(error_type: str, *chunks: str) -> str:
     """Extract the error message."""
     # Try to find the line with the error type and message
-    pattern = rf"{error_type}:\s*(.+)"
-    match = re.search(pattern, output)
+    match = _search(_message_re(error_type), chunks)
     if match:
         return match.group(1).strip()[:200]  # Limit length
     
     # For assertion errors, try to extract the assertion details
     if error_type == "AssertionError":
         # Look for "assert X == Y" patterns
-        assert_pattern = r"assert\s+(.+)"
-        match = re.search(assert_pattern, output)
+        match = _search(_ASSERT_RE, chunks)
         if match:
             return f"Assertion failed: {match.group(1)[:150]}"
         
         # Look for "E       assert" pytest format
-        e_assert_pattern = r"E\s+assert\s+(.+)"
-        match = re.search(e_assert_pattern, output)
+        match = _search(_E_ASSERT_RE, chunks)
         if match:
             return f"Assertion failed: {match.group(1)[:150]}"
     
     return "Unknown error occurred"
 
 
-def _extract_failing_tests(output: str) -> List[str]:
+def _extract_failing_tests(*chunks: str) -> List[str]:
     """Extract names of failing tests from pytest output."""
     failing_tests = []
     
     # Pattern: "FAILED test_solution.py::test_name"
-    pattern = r"FAILED\s+\S+::(\w+)"
-    matches = re.findall(pattern, output)
-    failing_tests.extend(matches)
+    for chunk in chunks:
+        failing_tests.extend(_FAILED_TEST_RE.findall(chunk))
     
     # Pattern: "test_name FAILED" or "______ test_name ______"
-    pattern2 = r"_{3,}\s*(\w+)\s*_{3,}"
-    matches2 = re.findall(pattern2, output)
-    for match in matches2:
-        if match.startswith("test_") and match not in failing_tests:
-            failing_tests.append(match)
+    for chunk in chunks:
+        for match in _TEST_HEADER_RE.findall(chunk):
+            if match.startswith("test_") and match not in failing_tests:
+                failing_tests.append(match)
     
     return failing_tests
 
-def _get_expected_actual(output: str) -> Optional[dict]:
-    result = {}
-    
-    m = re.search(r"assert\s+(.+?)\s*==\s*(.+?)(?:\n|$)", output)
-    if m:
-        result["actual"] = m.group(1).strip()[:100]
-        result["expected"] = m.group(2).strip()[:100]
-    
-    m = re.search(r"where\s+.+?=\s*\w+\((.+?)\)", output)
-    if m:
-        result["input"] = m.group(1).strip()[:100]
-    
-    return result if result else None
+def _get_expected_actual(*chunks: str) -> Optional[dict]:
+    m = _search(_EXPECTED_ACTUAL_RE, chunks)
+    if not m:
+        return None
+    
+    result = {
+        "actual": m.group("actual").strip()[:100],
+        "expected": m.group("expected").strip()[:100]
+    }
+    if m.group("input"):
+        result["input"] = m.group("input").strip()[:100]
+    
+    return result
 
 
 def summarize_error(error_info: ErrorInfo) -> str:
@@ -240,29 +266,57 @@ def summarize_error(error_info: ErrorInfo) -> str:
     Returns:
         A clear, concise summary string
     """
-    if error_info.category == ErrorCategory.SYNTAX:
-        line_info = f" at line {error_info.line_number}" if error_info.line_number else ""
-        return f"SyntaxError{line_info}: {error_info.message}. Check parentheses, colons, and indentation."
-    
-    elif error_info.category == ErrorCategory.NAME:
-        return f"{error_info.error_type}: {error_info.message}. Check variable/function names and imports."
-    
-    elif error_info.category == ErrorCategory.TYPE:
-        return f"{error_info.error_type}: {error_info.message}. Check data types and method calls."
-    
-    elif error_info.category == ErrorCategory.LOGIC:
-        tests = ", ".join(error_info.failing_tests) if error_info.failing_tests else "unknown tests"
-        return f"Logic error: Wrong output. Failing tests: {tests}. Review the algorithm logic."
-    
-    elif error_info.category == ErrorCategory.RUNTIME:
-        line_info = f" at line {error_info.line_number}" if error_info.line_number else ""
-        return f"{error_info.error_type}{line_info}: {error_info.message}. Check boundary conditions and edge cases."
-    
-    elif error_info.category == ErrorCategory.TIMEOUT:
-        return "Timeout: Code took too long. Check for infinite loops, excessive recursion, or inefficient algorithms."
-    
-    else:
-        return f"Error: {error_info.error_type} - {error_info.message}"
+    # parse_pytest_output hands back the same ErrorInfo for the same output,
+    # so the summary is worked out once per error and stored on it
+    if error_info._summary is None:
+        # derived from the frozen fields, so caching it in place is safe
+        object.__setattr__(
+            error_info, "_summary",
+            _CATEGORY_SUMMARIZERS.get(error_info.category, _summarize_other)(error_info)
+        )
+    return error_info._summary
+
+
+def _summarize_syntax(error_info: ErrorInfo) -> str:
+    line_info = f" at line {error_info.line_number}" if error_info.line_number else ""
+    return f"SyntaxError{line_info}: {error_info.message}. Check parentheses, colons, and indentation."
+
+
+def _summarize_name(error_info: ErrorInfo) -> str:
+    return f"{error_info.error_type}: {error_info.message}. Check variable/function names and imports."
+
+
+def _summarize_type(error_info: ErrorInfo) -> str:
+    return f"{error_info.error_type}: {error_info.message}. Check data types and method calls."
+
+
+def _summarize_logic(error_info: ErrorInfo) -> str:
+    tests = ", ".join(error_info.failing_tests) if error_info.failing_tests else "unknown tests"
+    return f"Logic error: Wrong output. Failing tests: {tests}. Review the algorithm logic."
+
+
+def _summarize_runtime(error_info: ErrorInfo) -> str:
+    line_info = f" at line {error_info.line_number}" if error_info.line_number else ""
+    return f"{error_info.error_type}{line_info}: {error_info.message}. Check boundary conditions and edge cases."
+
+
+def _summarize_timeout(error_info: ErrorInfo) -> str:
+    return "Timeout: Code took too long. Check for infinite loops, excessive recursion, or inefficient algorithms."
+
+
+def _summarize_other(error_info: ErrorInfo) -> str:
+    return f"Error: {error_info.error_type} - {error_info.message}"
+
+
+# one dict lookup per summary instead of walking an if/elif chain
+_CATEGORY_SUMMARIZERS = {
+    ErrorCategory.SYNTAX: _summarize_syntax,
+    ErrorCategory.NAME: _summarize_name,
+    ErrorCategory.TYPE: _summarize_type,
+    ErrorCategory.LOGIC: _summarize_logic,
+    ErrorCategory.RUNTIME: _summarize_runtime,
+    ErrorCategory.TIMEOUT: _summarize_timeout,
+}
 
 
 # Test when running directly
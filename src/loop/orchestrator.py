@@ -2,19 +2,22 @@
 Main loop - generate, test, fix, repeat.
 """
 
+import os
 import time
-from typing import Optional, List
-from pydantic import BaseModel
+import asyncio
+from dataclasses import dataclass
+from typing import Optional, List, Iterable, Tuple
 
 from ..llm.ollama_client import OllamaClient
 from ..llm.prompts import build_generation_prompt
 from ..sandbox.docker_runner import DockerSandbox
 from ..sandbox.guardrails import check_code_safety, check_test_integrity
 from .error_parser import parse_pytest_output, ErrorInfo
-from .patch_builder import build_adaptive_repair_prompt
+from .patch_builder import build_focused_repair_prompt, merge_repair
 
 
-class Attempt(BaseModel):
+@dataclass(slots=True)
+class Attempt:
     number: int
     code: str
     status: str
@@ -23,7 +26,8 @@ class Attempt(BaseModel):
     exec_time: float = 0.0
 
 
-class SolutionResult(BaseModel):
+@dataclass(slots=True)
+class SolutionResult:
     status: str
     attempts: List[Attempt]
     final_code: Optional[str] = None
@@ -36,31 +40,137 @@ class SolutionResult(BaseModel):
 
 class Orchestrator:
     
-    def __init__(self, llm=None, sandbox=None, max_attempts=3):
+    def __init__(self, llm=None, sandbox=None, max_attempts=3, semantic_cache=None):
         self.llm = llm or OllamaClient()
         self.sandbox = sandbox or DockerSandbox()
         self.max_attempts = max_attempts
+        # optional SemanticCache consulted before each first generation.
+        # repair prompts are left out: they differ mostly in the code and
+        # error, which a near-duplicate match would happily ignore
+        self.semantic_cache = semantic_cache
     
     def solve(self, problem_desc: str, tests: str) -> SolutionResult:
+        self._prewarm()
+        steps = self._steps(problem_desc, tests)
+        try:
+            op, arg = next(steps)
+            while True:
+                if op == "run":
+                    op, arg = steps.send(self.sandbox.run(arg, tests))
+                else:
+                    op, arg = steps.send(self._generate(arg, op == "generate"))
+        except StopIteration as done:
+            return done.value
+    
+    async def asolve(self, problem_desc: str, tests: str) -> SolutionResult:
+        # same loop as solve(), but awaits the LLM + sandbox so many
+        # problems can be in flight at once
+        self._prewarm()
+        steps = self._steps(problem_desc, tests)
+        try:
+            op, arg = next(steps)
+            while True:
+                if op == "run":
+                    op, arg = steps.send(await self._arun(arg, tests))
+                else:
+                    op, arg = steps.send(await self._agenerate(arg, op == "generate"))
+        except StopIteration as done:
+            return done.value
+    
+    async def solve_many(
+        self,
+        problems: Iterable[Tuple[str, str]],
+        concurrency: Optional[int] = None
+    ) -> List[SolutionResult]:
+        # fans (problem_desc, tests) pairs out over asolve. the default matches
+        # however many requests ollama was told to serve in parallel
+        if concurrency is None:
+            concurrency = int(os.environ.get("OLLAMA_NUM_PARALLEL", 8))
+        sem = asyncio.Semaphore(max(1, concurrency))
+        
+        # one pooled container per in-flight solve, started as they're needed
+        if getattr(self.sandbox, "pool_size", concurrency) < concurrency:
+            self.sandbox.pool_size = concurrency
+        
+        async def bounded(problem_desc: str, tests: str):
+            async with sem:
+                return await self.asolve(problem_desc, tests)
+        
+        return list(await asyncio.gather(*(bounded(d, t) for d, t in problems)))
+    
+    def _generate(self, prompt: str, semantic: bool = True):
+        if self.semantic_cache is None or not semantic:
+            return self.llm.generate(prompt)
+        hit, vec = self.semantic_cache.lookup(prompt)
+        if hit is not None:
+            return hit
+        res = self.llm.generate(prompt)
+        self.semantic_cache.add(vec, res)
+        return res
+    
+    async def _agenerate(self, prompt: str, semantic: bool = True):
+        semantic = semantic and self.semantic_cache is not None
+        if semantic:
+            hit, vec = await self.semantic_cache.alookup(prompt)
+            if hit is not None:
+                return hit
+        
+        agenerate = getattr(self.llm, "agenerate", None)
+        if agenerate is not None:
+            res = await agenerate(prompt)
+        else:
+            res = await asyncio.to_thread(self.llm.generate, prompt)
+        
+        if semantic:
+            self.semantic_cache.add(vec, res)
+        return res
+    
+    async def _arun(self, code: str, tests: str):
+        # the docker call blocks in a worker thread (subprocess releases the
+        # GIL), so other problems keep generating while this one executes
+        arun = getattr(self.sandbox, "arun", None)
+        if arun is not None:
+            return await arun(code, tests)
+        return await asyncio.to_thread(self.sandbox.run, code, tests)
+    
+    def _build_repair(self, code: str, error: ErrorInfo, problem_desc: str, tests: str) -> Tuple[str, Tuple[str, ...]]:
+        # subclasses override this to try other repair prompts. returns the
+        # prompt and the names of any functions it left out of the code
+        return build_focused_repair_prompt(code, error, problem_desc, tests)
+    
+    def _prewarm(self):
+        # container startup overlaps the first generation instead of
+        # waiting behind it - the first run is on the critical path
+        prewarm = getattr(self.sandbox, "prewarm", None)
+        if prewarm is not None:
+            prewarm()
+    
+    def _steps(self, problem_desc: str, tests: str):
+        # the retry loop without any I/O - yields ("generate", prompt),
+        # ("repair", prompt) or ("run", code) and gets the result sent
+        # back, so solve/asolve only differ in how they do the calls
         t0 = time.time()
         attempts = []
         prev_code = None
         prev_err = None
-        prev_sig = None
+        cut = ()
+        seen_sigs = set()
         
         for n in range(1, self.max_attempts + 1):
             # first attempt = generate, rest = repair
             if n == 1:
                 prompt = build_generation_prompt(problem_desc)
             else:
-                prompt = build_adaptive_repair_prompt(
-                    prev_code, prev_err, problem_desc, tests
-                )
+                prompt, cut = self._build_repair(prev_code, prev_err, problem_desc, tests)
             
             t1 = time.time()
-            res = self.llm.generate(prompt)
+            res = yield ("generate" if n == 1 else "repair", prompt)
             gen_time = time.time() - t1
             code = res.code
+            if cut:
+                # the prompt only showed the failing functions - put the
+                # ones it left out back
+                code = merge_repair(prev_code, code, cut)
             
             # safety checks
             safe, violations = check_code_safety(code)
@@ -74,7 +184,7 @@ class Orchestrator:
                 return SolutionResult(status="TAMPERED", attempts=attempts, total_time=time.time()-t0)
             
             # run it
-            exec_res = self.sandbox.run(code, tests)
+            exec_res = yield ("run", code)
             
             if exec_res.passed:
                 attempts.append(Attempt(
@@ -89,8 +199,10 @@ class Orchestrator:
             # failed - parse what went wrong
             err = parse_pytest_output(exec_res.stdout, exec_res.stderr, exec_res.timeout_occurred)
             
-            # same error twice? give up
-            if prev_sig and err.signature == prev_sig:
+            # an error we already hit on any earlier attempt, or one that is
+            # rarely fixed (timeouts) showing up again after a repair - another
+            # generation + run is unlikely to help, so give up
+            if err.signature in seen_sigs or (n >= 2 and err.fixable_probability < 0.25):
                 attempts.append(Attempt(
                     number=n, code=code, status="FAIL", error=err,
                     gen_time=gen_time, exec_time=exec_res.execution_time
@@ -104,7 +216,7 @@ class Orchestrator:
             
             prev_code = code
             prev_err = err
-            prev_sig = err.signature
+            seen_sigs.add(err.signature)
         
         return SolutionResult(status="MAX_ATTEMPTS", attempts=attempts, total_time=time.time()-t0)
 
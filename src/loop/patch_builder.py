@@ -2,76 +2,306 @@
 Builds repair prompts from errors.
 """
 
+import io
+import re
+import ast
+import tokenize
+from itertools import islice
+from functools import lru_cache
+from typing import Tuple
+
 from .error_parser import ErrorInfo, ErrorCategory
 
 
 def build_adaptive_repair_prompt(code: str, error: ErrorInfo, problem_desc: str = "", tests: str = "") -> str:
     """Pick the right repair strategy based on error type."""
+    return _repair_prompt(code, error, tests)[0]
+
+
+def build_focused_repair_prompt(
+    code: str, error: ErrorInfo, problem_desc: str = "", tests: str = ""
+) -> Tuple[str, Tuple[str, ...]]:
+    """
+    build_adaptive_repair_prompt, plus the names of the top-level functions
+    the prompt left out - pass those to merge_repair() with the reply.
+    """
+    return _repair_prompt(code, error, tests)
+
+
+def _repair_prompt(code: str, error: ErrorInfo, tests: str) -> Tuple[str, Tuple[str, ...]]:
+    code, cut = _focus(code, error)
+    if error.category != ErrorCategory.SYNTAX:
+        # a syntax fix needs the text exactly as it failed
+        code = strip_comments(code)
     
-    if error.category == ErrorCategory.SYNTAX:
-        return _syntax_prompt(code, error)
-    elif error.category == ErrorCategory.LOGIC:
-        return _logic_prompt(code, error, tests)
-    else:
-        return _generic_prompt(code, error)
+    return _REPAIR_BUILDERS.get(error.category, _generic_prompt)(code, error, tests), cut
 
 
-def _syntax_prompt(code: str, error: ErrorInfo) -> str:
-    return f"""This code has a syntax error. Fix it.
-```python
-{code}
-```
+# any line containing "assert", same as the old `'assert' in line` filter
+_ASSERT_LINE_RE = re.compile(r"^[ \t]*(.*assert.*)$", re.MULTILINE)
 
-Error: {error.message}
-Line: {error.line_number or 'unknown'}
 
-Return ONLY the fixed code, no explanation."""
+@lru_cache(maxsize=1024)
+def extract_test_asserts(tests: str) -> Tuple[str, ...]:
+    """First 5 assert lines from the tests, stripped - the same tests string
+    comes back on every attempt, so this is cached."""
+    # one scan in C that stops after the 5th hit, instead of splitting the
+    # whole file into lines first
+    return tuple(m.group(1).strip() for m in islice(_ASSERT_LINE_RE.finditer(tests), 5))
 
 
-def _logic_prompt(code: str, error: ErrorInfo, tests: str) -> str:
-    test_hints = ""
-    if tests:
-        lines = [l.strip() for l in tests.split('\n') if 'assert' in l]
-        if lines:
-            test_hints = "\n\nExpected behavior from tests:"
-            for line in lines[:5]:
-                test_hints += f"\n  {line}"
-    
-    # add expected vs actual if available
-    diff_hint = ""
-    if error.expected_vs_actual:
-        diff_hint = "\n\nWhat went wrong:"
-        if "input" in error.expected_vs_actual:
-            diff_hint += f"\n  Input: {error.expected_vs_actual['input']}"
-        if "expected" in error.expected_vs_actual:
-            diff_hint += f"\n  Expected: {error.expected_vs_actual['expected']}"
-        if "actual" in error.expected_vs_actual:
-            diff_hint += f"\n  Got: {error.expected_vs_actual['actual']}"
-    
-    return f"""The code below produces WRONG OUTPUT.
+# "solution.py:12" in a traceback - but not "test_solution.py:12"
+_SOLUTION_LINE_RE = re.compile(r"(?<!test_)solution\.py:(\d+)")
+
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _node_start(node: ast.stmt) -> int:
+    return min([node.lineno, *(d.lineno for d in getattr(node, "decorator_list", ()))])
+
+
+def focus_code(code: str, error: ErrorInfo) -> str:
+    """
+    Cut the code down to the functions the failure points at, so repair
+    prompts for multi-function files don't carry every helper. Imports,
+    constants and classes stay. Returns the code unchanged if it doesn't
+    parse or nothing narrower can be picked.
+    """
+    return _focus(code, error)[0]
+
+
+def _focus(code: str, error: ErrorInfo) -> Tuple[str, Tuple[str, ...]]:
+    # (focused code, names of the functions that were cut)
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return code, ()
+    
+    funcs = [n for n in tree.body if isinstance(n, _FUNCTION_NODES)]
+    if len(funcs) < 2:
+        return code, ()
+    
+    # functions holding a solution.py line from the traceback, plus any
+    # named exactly like a failing test (test_foo -> foo)
+    lines = {int(m) for m in _SOLUTION_LINE_RE.findall(error.traceback)}
+    if not lines and error.category == ErrorCategory.LOGIC:
+        # a failed assert has no frames in the solution, so nothing says
+        # which function is wrong - show it all
+        return code, ()
+    
+    by_name = {n.name: n for n in funcs}
+    tested = {t.split("test_", 1)[-1] for t in error.failing_tests}
+    todo = [
+        n for n in funcs
+        if n.name in tested or any(_node_start(n) <= ln <= n.end_lineno for ln in lines)
+    ]
+    if not todo:
+        return code, ()
+    # top-level code stays in the prompt, so whatever it uses stays too
+    todo += [n for n in tree.body if not isinstance(n, _FUNCTION_NODES)]
+    
+    # plus everything those call or reference, transitively - a bug in a
+    # helper must not be cut out of the prompt
+    keep = set()
+    while todo:
+        node = todo.pop()
+        if isinstance(node, _FUNCTION_NODES):
+            if node.name in keep:
+                continue
+            keep.add(node.name)
+        todo += [
+            by_name[n.id] for n in ast.walk(node)
+            if isinstance(n, ast.Name) and n.id in by_name and n.id not in keep
+        ]
+    if len(keep) == len(funcs):
+        return code, ()
+    
+    src = code.splitlines()
+    cut = []
+    for n in reversed(funcs):
+        if n.name not in keep:
+            del src[_node_start(n) - 1:n.end_lineno]
+            cut.append(n.name)
+    # don't leave the blank lines of every cut function behind
+    return _BLANK_RUN_RE.sub("\n\n\n", "\n".join(src)), tuple(reversed(cut))
+
+
+def strip_comments(code: str) -> str:
+    """
+    Drop # comments from the code. Docstrings are kept - for these problems
+    the docstring is usually the spec, and repair prompts don't repeat it.
+    """
+    try:
+        comments = [
+            tok.start for tok in tokenize.generate_tokens(io.StringIO(code).readline)
+            if tok.type == tokenize.COMMENT
+        ]
+    except (tokenize.TokenError, SyntaxError):
+        return code
+    if not comments:
+        return code
+    
+    src = code.splitlines()
+    for row, col in reversed(comments):
+        line = src[row - 1][:col].rstrip()
+        if line:
+            src[row - 1] = line
+        else:
+            del src[row - 1]   # comment-only line
+    return "\n".join(src)
+
+
+def _bound_names(node: ast.stmt) -> set:
+    """Names a top-level statement binds (not the ones it only reads)."""
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return {(a.asname or a.name).split(".")[0] for a in node.names}
+    if isinstance(node, (*_FUNCTION_NODES, ast.ClassDef)):
+        return {node.name}
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, ast.AnnAssign):
+        targets = [node.target]
+    else:
+        return set()
+    return {
+        n.id for t in targets for n in ast.walk(t)
+        if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)
+    }
+
+
+def merge_repair(original: str, fixed: str, cut: Tuple[str, ...]) -> str:
+    """
+    Put back the functions a focused repair prompt left out (`cut`, from
+    build_focused_repair_prompt) that the fixed code doesn't define, along
+    with any original imports, constants and classes it dropped. They go
+    ahead of the fixed code's body, so its top-level statements can use them.
+    """
+    if not cut:
+        return fixed
+    try:
+        old_tree = ast.parse(original)
+        new_tree = ast.parse(fixed)
+    except (SyntaxError, ValueError):
+        return fixed
+    
+    bound = set()
+    for n in new_tree.body:
+        bound |= _bound_names(n)
+    old_src = original.splitlines()
+    
+    def segment(node):
+        return "\n".join(old_src[_node_start(node) - 1:node.end_lineno])
+    
+    # the prompt showed the imports, constants and classes, so a reply that
+    # only has the fixed function drops them - restore any it doesn't bind.
+    # functions only come back if the prompt cut them
+    restored = [
+        segment(n) for n in old_tree.body
+        if isinstance(n, (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign, ast.ClassDef))
+        and _bound_names(n) and not _bound_names(n) <= bound
+    ]
+    restored += [
+        segment(n) for n in old_tree.body
+        if isinstance(n, _FUNCTION_NODES) and n.name in cut and n.name not in bound
+    ]
+    if not restored:
+        return fixed
+    
+    # after the fixed code's leading imports, before everything else
+    split = 0
+    for n in new_tree.body:
+        if not isinstance(n, (ast.Import, ast.ImportFrom)):
+            break
+        split = n.end_lineno
+    new_src = fixed.rstrip("\n").splitlines()
+    head = "\n".join(new_src[:split])
+    body = "\n".join(new_src[split:]).strip("\n")
+    
+    parts = [head, *restored, body]
+    return "\n\n".join(p for p in parts if p) + "\n"
+
+
+# shared opening line for every repair prompt, then the per-category
+# instructions, and the code/error (which change every call) go last -
+# keeps the cacheable prefix as long as possible
+REPAIR_PREFIX = "Return ONLY the fixed code, no explanation.\n\n"
+
+# templates are built once here; each call only fills the slots
+SYNTAX_TEMPLATE = REPAIR_PREFIX + """This code has a syntax error. Fix it.
 ```python
 {code}
 ```
-{test_hints}
-{diff_hint}
+
+Error: {message}{line}"""
+
+LOGIC_TEMPLATE = REPAIR_PREFIX + """The code below produces WRONG OUTPUT.
 
 Think step by step:
 1. What does each test expect?
 2. What is the current code actually doing?
 3. How should the logic change?
 
-Return ONLY the fixed code, no explanation."""
+```python
+{code}
+```{test_hints}{diff_hint}"""
 
-def _generic_prompt(code: str, error: ErrorInfo) -> str:
-    return f"""This code has an error. Fix it.
+GENERIC_TEMPLATE = REPAIR_PREFIX + """This code has an error. Fix it.
 ```python
 {code}
 ```
 
-Error type: {error.error_type}
-Message: {error.message}
+Error type: {error_type}
+Message: {message}"""
+
+# (key in expected_vs_actual, label) in the order they're shown
+_DIFF_FIELDS = (("input", "Input"), ("expected", "Expected"), ("actual", "Got"))
+
+
+def _syntax_prompt(code: str, error: ErrorInfo, tests: str = "") -> str:
+    return SYNTAX_TEMPLATE.format_map({
+        "code": code,
+        "message": error.message,
+        # no "Line: unknown" filler when the parser found no line
+        "line": f"\nLine: {error.line_number}" if error.line_number else ""
+    })
+
+
+def _logic_prompt(code: str, error: ErrorInfo, tests: str) -> str:
+    test_hints = ""
+    lines = extract_test_asserts(tests)
+    if lines:
+        test_hints = "".join(["\n\nExpected behavior from tests:", *(f"\n  {line}" for line in lines)])
+    
+    # add expected vs actual if available. both hints start with their own
+    # blank line and are left out entirely when empty
+    diff_hint = ""
+    ev = error.expected_vs_actual
+    if ev:
+        diff_hint = "".join(["\n\nWhat went wrong:", *(f"\n  {label}: {ev[key]}" for key, label in _DIFF_FIELDS if key in ev)])
+    
+    return LOGIC_TEMPLATE.format_map({
+        "code": code,
+        "test_hints": test_hints,
+        "diff_hint": diff_hint
+    })
+
+
+def _generic_prompt(code: str, error: ErrorInfo, tests: str = "") -> str:
+    return GENERIC_TEMPLATE.format_map({
+        "code": code,
+        "error_type": error.error_type,
+        "message": error.message
+    })
+
 
-Return ONLY the fixed code, no explanation."""
+# one dict lookup per prompt instead of an if/elif chain; categories not
+# listed get the generic prompt. all builders take (code, error, tests)
+_REPAIR_BUILDERS = {
+    ErrorCategory.SYNTAX: _syntax_prompt,
+    ErrorCategory.LOGIC: _logic_prompt,
+}
 
 
 # test it
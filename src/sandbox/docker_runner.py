@@ -3,15 +3,29 @@ Docker Sandbox Runner - Executes code safely in isolated containers.
 """
 
 import os
-import uuid
-import tempfile
+import re
+import sys
+import time
+import asyncio
+import queue
+import shutil
+import hashlib
+import weakref
+import shlex
+import itertools
+import traceback
+import threading
 import subprocess
 from pathlib import Path
-from typing import Optional
-from pydantic import BaseModel
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 
 
-class ExecutionResult(BaseModel):
+# built on every run, so a plain slotted dataclass rather than a validating
+# model. frozen, which lets the result cache hand out the same instance
+@dataclass(slots=True, frozen=True)
+class ExecutionResult:
     """Result from executing code in the sandbox."""
     passed: bool
     exit_code: int
@@ -21,6 +35,49 @@ class ExecutionResult(BaseModel):
     timeout_occurred: bool = False
 
 
+# prepended to the tests so they see the solution's names
+TEST_HEADER = b"# Auto-generated test file\nfrom solution import *\n\n"
+
+# the pytest run inside the container. no cache dir (the mount is read-only
+# anyway), and PYTEST_DISABLE_PLUGIN_AUTOLOAD skips the entry-point scan for
+# third-party plugins, which is most of pytest's startup cost
+PYTEST_CMD = ("pytest", "-q", "test_solution.py", "-x", "-p", "no:cacheprovider")
+
+# run after every test run in a pooled container: kill whatever the code left
+# running (kill -1 spares pid 1, the container's `sleep`, and the shell
+# itself) and empty the /tmp tmpfs, the only writable place left
+_SCRUB = "kill -9 -1 2>/dev/null; rm -rf /tmp/* /tmp/.[!.]* 2>/dev/null"
+
+# run_batch: line after each candidate's output carrying its exit code. a
+# timeout shows up as `timeout`'s own 124, or as 137 plus its -v notice if
+# the code ignored TERM and had to be killed - a bare 137 is some other
+# SIGKILL, such as the OOM killer
+_BATCH_MARKER = "__sandbox_exit__"
+_BATCH_SPLIT_RE = re.compile(rf"^{_BATCH_MARKER} (\d+)\n?", re.MULTILINE)
+_TIMED_OUT = 124
+_KILLED = 128 + 9
+_TIMEOUT_NOTICE = "timeout: sending signal"
+
+# how many (code, tests) results a sandbox remembers
+RESULT_CACHE_SIZE = 256
+
+
+def _remove_containers(containers: list):
+    started = [c for c in containers if c is not None]
+    containers.clear()
+    if started:
+        try:
+            subprocess.run(
+                ["docker", "rm", "-f", *started],
+                capture_output=True,
+                timeout=30
+            )
+        except (subprocess.SubprocessError, OSError):
+            # docker hung or is gone - nothing more to do from here, and
+            # this also runs at interpreter exit
+            pass
+
+
 class DockerSandbox:
     """Executes Python code safely in Docker containers."""
     
@@ -29,12 +86,131 @@ class DockerSandbox:
         image: str = "code-runner:latest",
         timeout: int = 15,
         memory_limit: str = "512m",
-        cpu_limit: float = 1.0
+        cpu_limit: float = 1.0,
+        persistent: bool = True,
+        pool_size: int = 1
     ):
         self.image = image
         self.timeout = timeout
         self.memory_limit = memory_limit
         self.cpu_limit = cpu_limit
+        
+        # Keep containers running and `docker exec` each test run into one,
+        # instead of paying container startup on every attempt. Up to
+        # pool_size are started on demand so concurrent runs don't share one
+        # container's cpu/pids limits
+        self.persistent = persistent
+        self.pool_size = pool_size
+        self._containers: list = []
+        self._idle: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        # the runners rarely call close(), so remove the containers when the
+        # sandbox is collected or the interpreter exits instead of leaving
+        # `sleep infinity` containers behind
+        self._finalizer = weakref.finalize(self, _remove_containers, self._containers)
+        
+        # Scratch files go to RAM-backed /dev/shm on Linux. Elsewhere use the
+        # project directory for Windows/Mac Docker compatibility. The dir is
+        # private to this sandbox and mounted at /work in its containers
+        shm = Path("/dev/shm")
+        if sys.platform.startswith("linux") and shm.is_dir():
+            scratch_root = shm
+        else:
+            scratch_root = Path(__file__).parent.parent.parent / "temp"
+        self.temp_base = scratch_root / f"sandbox_{os.getpid()}_{id(self):x}"
+        weakref.finalize(self, shutil.rmtree, str(self.temp_base), True)
+        
+        # repair loops often resubmit a candidate they already ran, so the
+        # results are kept in a small LRU keyed by digests of code and tests
+        self._results: OrderedDict = OrderedDict()
+        # temp_base is already unique to this process and sandbox, so a
+        # counter is enough to name the per-run dirs
+        self._run_ids = itertools.count()
+        self._available: Optional[bool] = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Stop the pooled containers, if any were started."""
+        with self._lock:
+            _remove_containers(self._containers)
+            self._idle = queue.Queue()
+        shutil.rmtree(self.temp_base, ignore_errors=True)
+    
+    def prewarm(self):
+        """Start a pooled container in the background, if none is up yet."""
+        if self.persistent and not self._containers:
+            threading.Thread(target=self._prewarm, daemon=True).start()
+    
+    def _prewarm(self):
+        try:
+            self.release(self.acquire())
+        except (subprocess.SubprocessError, OSError):
+            pass  # run() starts it again and reports the error
+    
+    def acquire(self) -> str:
+        """Take an idle container from the pool, starting one if the pool isn't full."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            
+            with self._lock:
+                grow = len(self._containers) < self.pool_size
+                if grow:
+                    # reserve the slot so concurrent acquires don't overshoot
+                    self._containers.append(None)
+            
+            if grow:
+                break
+            
+            # wake up now and then - a discarded container frees a slot
+            # without anything being put back on the queue
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+        
+        try:
+            container = self._start_container()
+        except BaseException:
+            with self._lock:
+                # close() may have cleared the reservation already
+                if None in self._containers:
+                    self._containers.remove(None)
+            raise
+        
+        with self._lock:
+            if None in self._containers:
+                self._containers[self._containers.index(None)] = container
+            else:
+                # close() ran while this one was starting - track it anew so
+                # the next close() or the finalizer still removes it
+                self._containers.append(container)
+        return container
+    
+    def release(self, container: str):
+        """Hand a container back to the pool."""
+        with self._lock:
+            pooled = container in self._containers
+            if pooled:
+                self._idle.put(container)
+        if not pooled:
+            # close() removed it while it was in use - don't hand out a
+            # container that no longer exists
+            _remove_containers([container])
+    
+    def _discard(self, container: str):
+        """Remove a container for good, freeing its pool slot."""
+        with self._lock:
+            if container in self._containers:
+                self._containers.remove(container)
+        _remove_containers([container])
     
     def run(self, code: str, tests: str) -> ExecutionResult:
         """
@@ -47,46 +223,16 @@ class DockerSandbox:
         Returns:
             ExecutionResult with pass/fail status and output
         """
-        import time
+        key = self._result_key(code, tests)
+        early = self._precheck(code, tests) or self._cached(key)
+        if early is not None:
+            return early
         
-        # Create temporary directory for code files
-        # Use project directory for Windows Docker compatibility
-        project_root = Path(__file__).parent.parent.parent
-        temp_base = project_root / "temp"
-        temp_base.mkdir(exist_ok=True)
-        temp_dir = str(temp_base / f"code_exec_{uuid.uuid4().hex[:8]}")
-        os.makedirs(temp_dir)
+        container = self.acquire() if self.persistent else None
+        temp_dir = self._work_dir(container)
         
         try:
-            # Write solution file
-            solution_path = Path(temp_dir) / "solution.py"
-            solution_path.write_text(code, encoding="utf-8")
-            
-            # Write test file that imports the solution
-            test_content = f"""# Auto-generated test file
-from solution import *
-
-{tests}
-"""
-            test_path = Path(temp_dir) / "test_solution.py"
-            test_path.write_text(test_content, encoding="utf-8")
-            
-            # Build docker command
-            # Convert Windows path to Docker-compatible path
-            docker_temp_dir = temp_dir.replace("\\", "/")
-            
-            cmd = [
-                "docker", "run",
-                "--rm",                              # Remove container after exit
-                "--network=none",                    # No network access
-                f"--memory={self.memory_limit}",    # Memory limit
-                f"--cpus={self.cpu_limit}",         # CPU limit
-                "--pids-limit=50",                   # Limit processes
-                "-v", f"{docker_temp_dir}:/work:ro", # Mount code read-only
-                "-w", "/work",                       # Set working directory
-                self.image,
-                "pytest", "-q", "test_solution.py", "-x"  # Run tests, stop on first failure
-            ]
+            cmd = self._prepare(code, tests, container, temp_dir)
             
             # Execute
             start_time = time.time()
@@ -98,42 +244,349 @@ from solution import *
                     text=True,
                     timeout=self.timeout
                 )
-                execution_time = time.time() - start_time
-                timeout_occurred = False
-                
             except subprocess.TimeoutExpired:
-                execution_time = self.timeout
-                timeout_occurred = True
-                
-                # Kill the container if still running
-                return ExecutionResult(
-                    passed=False,
-                    exit_code=-1,
-                    stdout="",
-                    stderr="Execution timed out",
-                    execution_time=execution_time,
-                    timeout_occurred=True
-                )
-            
-            # Parse result
-            passed = result.returncode == 0
+                # subprocess.run already killed the docker client
+                self._kill(container, temp_dir)
+                container = None   # discarded by _kill, not back to the pool
+                return self._timed_out()
             
-            return ExecutionResult(
-                passed=passed,
+            return self._remember(key, ExecutionResult(
+                passed=result.returncode == 0,
                 exit_code=result.returncode,
                 stdout=result.stdout,
                 stderr=result.stderr,
-                execution_time=execution_time,
-                timeout_occurred=timeout_occurred
+                execution_time=time.time() - start_time
+            ))
+            
+        finally:
+            self._finish(container, temp_dir)
+    
+    async def arun(self, code: str, tests: str) -> ExecutionResult:
+        """
+        Async version of run(). The docker client runs as an asyncio
+        subprocess, so many runs can be in flight without a thread each.
+        """
+        key = self._result_key(code, tests)
+        early = self._precheck(code, tests) or self._cached(key)
+        if early is not None:
+            return early
+        
+        # acquire() may block on a full pool or start a container
+        container = await asyncio.to_thread(self.acquire) if self.persistent else None
+        temp_dir = self._work_dir(container)
+        
+        try:
+            cmd = self._prepare(code, tests, container, temp_dir)
+            
+            start_time = time.time()
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
             
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), self.timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                await asyncio.to_thread(self._kill, container, temp_dir)
+                container = None   # discarded by _kill, not back to the pool
+                return self._timed_out()
+            
+            return self._remember(key, ExecutionResult(
+                passed=proc.returncode == 0,
+                exit_code=proc.returncode,
+                stdout=stdout.decode(errors="replace"),
+                stderr=stderr.decode(errors="replace"),
+                execution_time=time.time() - start_time
+            ))
+            
         finally:
+            self._finish(container, temp_dir)
+    
+    def run_batch(self, candidates: List[Tuple[str, str]]) -> List[ExecutionResult]:
+        """
+        Execute several (code, tests) candidates with a single docker call.
+        
+        Each candidate gets its own subdirectory and pytest process, run one
+        after another by a shell loop in the container, so N candidates pay
+        for one exec/container start instead of N.
+        
+        Returns:
+            One ExecutionResult per candidate, in order
+        """
+        results: List[Optional[ExecutionResult]] = []
+        keys = []
+        for code, tests in candidates:
+            key = self._result_key(code, tests)
+            keys.append(key)
+            results.append(self._precheck(code, tests) or self._cached(key))
+        
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results
+        
+        container = self.acquire() if self.persistent else None
+        temp_dir = self._work_dir(container)
+        
+        try:
+            names = []
+            for i in pending:
+                name = f"candidate_{i}"
+                os.makedirs(os.path.join(temp_dir, name), exist_ok=True)
+                self._write_files(os.path.join(temp_dir, name), *candidates[i])
+                names.append(name)
+            
+            # per-candidate timeout inside (TERM, then KILL a second later);
+            # the exit code follows each candidate's output on a marker line
+            # of its own, even when the output has no trailing newline
+            script = (
+                f'for d; do (cd "$d" && timeout -v -k 1 {self.timeout} {shlex.join(PYTEST_CMD)} 2>&1); '
+                f'rc=$?; {_SCRUB}; echo; echo "{_BATCH_MARKER} $rc"; done'
+            )
+            cmd = self._command(container, temp_dir, ["sh", "-c", script, "sh", *names])
+            
+            start_time = time.time()
+            try:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=(self.timeout + 2) * len(names)
+                )
+            except subprocess.TimeoutExpired:
+                self._kill(container, temp_dir)
+                container = None   # discarded by _kill, not back to the pool
+                for i in pending:
+                    results[i] = self._timed_out()
+                return results
+            
+            # [output, code, output, code, ..., trailing]
+            parts = _BATCH_SPLIT_RE.split(result.stdout)
+            execution_time = (time.time() - start_time) / len(names)
+            
+            for n, i in enumerate(pending):
+                if 2 * n + 1 >= len(parts):
+                    # the loop died before this candidate reported
+                    results[i] = ExecutionResult(
+                        passed=False,
+                        exit_code=result.returncode or -1,
+                        stdout="",
+                        stderr=result.stderr,
+                        execution_time=execution_time
+                    )
+                    continue
+                
+                exit_code = int(parts[2 * n + 1])
+                # drop the newline echoed ahead of the marker
+                output = parts[2 * n][:-1] if parts[2 * n].endswith("\n") else parts[2 * n]
+                if exit_code == _TIMED_OUT or (exit_code == _KILLED and _TIMEOUT_NOTICE in output):
+                    results[i] = self._timed_out()
+                    continue
+                
+                results[i] = self._remember(keys[i], ExecutionResult(
+                    passed=exit_code == 0,
+                    exit_code=exit_code,
+                    stdout=output,
+                    stderr="",
+                    execution_time=execution_time
+                ))
+            return results
+            
+        finally:
+            self._finish(container, temp_dir)
+    
+    def _precheck(self, code: str, tests: str) -> Optional[ExecutionResult]:
+        """Fail unparseable code locally, without a container round-trip."""
+        # the tests are checked as the file that gets written, header and
+        # all, so line numbers match and a late __future__ import still fails
+        test_file = TEST_HEADER.decode() + tests + "\n"
+        for source, filename in ((code, "solution.py"), (test_file, "test_solution.py")):
+            try:
+                compile(source, filename, "exec")
+            except (SyntaxError, ValueError) as e:
+                # same "File ..., line N" / "SyntaxError: msg" shape as a
+                # traceback, so the error parser classifies it as usual
+                return ExecutionResult(
+                    passed=False,
+                    exit_code=1,
+                    stdout="",
+                    stderr="".join(traceback.format_exception_only(type(e), e)),
+                    execution_time=0.0
+                )
+        return None
+    
+    @staticmethod
+    def _result_key(code: str, tests: str) -> tuple:
+        return (
+            hashlib.blake2b(code.encode(), digest_size=16).digest(),
+            hashlib.blake2b(tests.encode(), digest_size=16).digest()
+        )
+    
+    def _cached(self, key: tuple) -> Optional[ExecutionResult]:
+        with self._lock:
+            hit = self._results.get(key)
+            if hit is None:
+                return None
+            self._results.move_to_end(key)
+        return hit
+    
+    def _remember(self, key: tuple, result: ExecutionResult) -> ExecutionResult:
+        # timeouts aren't stored, they can depend on how loaded the host was
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return result
+    
+    def _work_dir(self, container: Optional[str]) -> str:
+        if container is not None:
+            # each pooled container owns a scratch dir that is reused run
+            # after run - the two files are overwritten, no dir churn
+            return str(self.temp_base / container[:12])
+        
+        # Create temporary directory for code files
+        self.temp_base.mkdir(parents=True, exist_ok=True)
+        temp_dir = str(self.temp_base / f"code_exec_{next(self._run_ids)}")
+        os.makedirs(temp_dir)
+        return temp_dir
+    
+    def _prepare(self, code: str, tests: str, container: Optional[str], temp_dir: str) -> list:
+        """Write the solution and test files and return the docker command."""
+        self._write_files(temp_dir, code, tests)
+        
+        if container is not None:
+            # killing the exec client doesn't stop pytest in there, so
+            # `timeout` does it just after our own timeout fires. then scrub
+            # the container, so the next run starts from the same state
+            return self._command(container, temp_dir, [
+                "sh", "-c", f'timeout -s KILL {self.timeout + 1} "$@"; rc=$?; {_SCRUB}; exit $rc',
+                "sh", *PYTEST_CMD
+            ])
+        return self._command(container, temp_dir, list(PYTEST_CMD))  # Run tests, stop on first failure
+    
+    @staticmethod
+    def _write_files(temp_dir: str, code: str, tests: str):
+        # Write solution file
+        solution_path = Path(temp_dir) / "solution.py"
+        solution_path.write_bytes(code.encode("utf-8"))
+        
+        # Write test file that imports the solution
+        test_path = Path(temp_dir) / "test_solution.py"
+        test_path.write_bytes(TEST_HEADER + tests.encode("utf-8") + b"\n")
+    
+    def _command(self, container: Optional[str], temp_dir: str, argv: list) -> list:
+        """Docker command that runs argv in temp_dir, via the container if given."""
+        if container is not None:
+            # no .pyc files, since solution.py is rewritten in place every run
+            return [
+                "docker", "exec",
+                "-w", f"/work/{Path(temp_dir).name}",
+                "-e", "PYTHONDONTWRITEBYTECODE=1",
+                "-e", "PYTEST_DISABLE_PLUGIN_AUTOLOAD=1",
+                container,
+                *argv
+            ]
+        
+        # Convert Windows path to Docker-compatible path
+        docker_temp_dir = temp_dir.replace("\\", "/")
+        
+        return [
+            "docker", "run",
+            "--rm",                              # Remove container after exit
+            "--name", self._run_name(temp_dir),  # So a timed-out run can be killed
+            *self._limit_args(),
+            "-v", f"{docker_temp_dir}:/work:ro", # Mount code read-only
+            "-w", "/work",                       # Set working directory
+            "-e", "PYTEST_DISABLE_PLUGIN_AUTOLOAD=1",
+            self.image,
+            *argv
+        ]
+    
+    def _run_name(self, temp_dir: str) -> str:
+        # unique per process, sandbox and run, like the dirs it is made from
+        return f"{self.temp_base.name}_{Path(temp_dir).name}"
+    
+    def _kill(self, container: Optional[str], temp_dir: str):
+        """Stop the container of a run that timed out on our side."""
+        if container is not None:
+            # the exec'd pytest may still be running in there (its own
+            # `timeout` fires a second later) and would see the next run's
+            # files change under it - so this container leaves the pool
+            self._discard(container)
+            return
+        
+        # killing the docker client leaves the container running, and --rm
+        # only cleans up once it exits - which hung code may never do
+        try:
+            subprocess.run(
+                ["docker", "kill", self._run_name(temp_dir)],
+                capture_output=True,
+                timeout=5
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            pass
+    
+    def _finish(self, container: Optional[str], temp_dir: str):
+        if container is not None:
+            self.release(container)
+        else:
             # Cleanup temporary directory
-            import shutil
             shutil.rmtree(temp_dir, ignore_errors=True)
     
-    def is_available(self) -> bool:
+    def _timed_out(self) -> ExecutionResult:
+        return ExecutionResult(
+            passed=False,
+            exit_code=-1,
+            stdout="",
+            stderr="Execution timed out",
+            execution_time=self.timeout,
+            timeout_occurred=True
+        )
+    
+    def _limit_args(self) -> list:
+        return [
+            "--network=none",                    # No network access
+            f"--memory={self.memory_limit}",    # Memory limit
+            f"--cpus={self.cpu_limit}",         # CPU limit
+            "--pids-limit=50",                   # Limit processes
+            "--read-only",                       # Nothing outside /tmp is writable
+            "--tmpfs", "/tmp:rw,size=64m",
+            "-e", "HOME=/tmp",                   # so ~/.local lands in the tmpfs too
+        ]
+    
+    def _start_container(self) -> str:
+        """Start a long-running container and return its id."""
+        # may run from prewarm() before any run() created it
+        self.temp_base.mkdir(parents=True, exist_ok=True)
+        docker_temp_base = str(self.temp_base).replace("\\", "/")
+        result = subprocess.run(
+            [
+                "docker", "run", "-d", "--rm",
+                *self._limit_args(),
+                "-v", f"{docker_temp_base}:/work:ro",
+                self.image,
+                "sleep", "infinity"
+            ],
+            capture_output=True,
+            text=True,
+            timeout=60,
+            check=True
+        )
+        container = result.stdout.strip()
+        (self.temp_base / container[:12]).mkdir(exist_ok=True)
+        return container
+    
+    def is_available(self, refresh: bool = False) -> bool:
         """Check if Docker is available and the image exists."""
+        # the daemon and image don't come and go within a run, so the two
+        # docker CLI calls are only made once unless refresh is asked for
+        if self._available is None or refresh:
+            self._available = self._check_available()
+        return self._available
+    
+    def _check_available(self) -> bool:
         try:
             # Check if Docker is running
             result = subprocess.run(
@@ -0,0 +1,155 @@
+"""
+Forkserver Sandbox - Runs tests in forked local processes, no Docker.
+
+POSIX only. The code runs on the host with only rlimits and a timeout around
+it, so use it as a fast path for inner-loop attempts and keep Docker for the
+candidate that is actually accepted (see FastPathSandbox). It also runs under
+the host's Python and pytest, which may not match the container's (3.10), so
+a result here is only a hint until Docker confirms it.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import traceback
+import multiprocessing
+from pathlib import Path
+
+from .docker_runner import DockerSandbox, ExecutionResult, TEST_HEADER
+
+
+# pytest's "tests ran, some failed" exit code. anything else besides 0
+# (collection errors, usage errors, a crashed child) isn't a verdict on the
+# code, so FastPathSandbox hands those to the verifying sandbox
+_TESTS_FAILED = 1
+_INTERNAL_ERROR = 3
+
+
+def _run_pytest(work_dir: str, memory_limit_mb: int):
+    # runs in the forked child - cap memory, send output to files, exit
+    # with pytest's return code
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+    os.chdir(work_dir)
+    sys.path.insert(0, work_dir)
+
+    for fd, name in ((1, "stdout.txt"), (2, "stderr.txt")):
+        out = os.open(name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        os.dup2(out, fd)
+        os.close(out)
+
+    try:
+        import pytest
+        rc = int(pytest.main(["-q", "test_solution.py", "-x", "-p", "no:cacheprovider"]))
+    except BaseException:
+        # pytest itself broke - report it as an internal error, not as
+        # failing tests
+        traceback.print_exc()
+        rc = _INTERNAL_ERROR
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(rc)
+
+
+class ForkserverSandbox:
+    """Executes tests in processes forked from a server that has pytest preloaded."""
+
+    def __init__(self, timeout: int = 15, memory_limit_mb: int = 512):
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+
+        # every child forks from one server with pytest already imported, so
+        # a run skips both interpreter startup and the pytest import
+        self._ctx = multiprocessing.get_context("forkserver")
+        self._ctx.set_forkserver_preload(["pytest"])
+
+    def run(self, code: str, tests: str) -> ExecutionResult:
+        """Same contract as DockerSandbox.run."""
+        work_dir = tempfile.mkdtemp(prefix="code_exec_")
+
+        try:
+            Path(work_dir, "solution.py").write_bytes(code.encode("utf-8"))
+            Path(work_dir, "test_solution.py").write_bytes(TEST_HEADER + tests.encode("utf-8") + b"\n")
+
+            start_time = time.time()
+            p = self._ctx.Process(target=_run_pytest, args=(work_dir, self.memory_limit_mb))
+            p.start()
+            p.join(self.timeout)
+
+            if p.is_alive():
+                p.kill()
+                p.join()
+                return ExecutionResult(
+                    passed=False,
+                    exit_code=-1,
+                    stdout="",
+                    stderr="Execution timed out",
+                    execution_time=self.timeout,
+                    timeout_occurred=True
+                )
+
+            execution_time = time.time() - start_time
+            stdout = Path(work_dir, "stdout.txt")
+            stderr = Path(work_dir, "stderr.txt")
+
+            return ExecutionResult(
+                passed=p.exitcode == 0,
+                exit_code=p.exitcode,
+                stdout=stdout.read_text(errors="replace") if stdout.exists() else "",
+                stderr=stderr.read_text(errors="replace") if stderr.exists() else "",
+                execution_time=execution_time
+            )
+
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def is_available(self) -> bool:
+        if not hasattr(os, "fork"):
+            return False
+        try:
+            import pytest  # noqa: F401 - the forkserver preloads it
+        except ImportError:
+            return False
+        return True
+
+
+class FastPathSandbox:
+    """
+    Runs every attempt in the fast sandbox and only re-runs passing code in
+    the verifying one (normally Docker), so failed attempts never pay for a
+    container exec but nothing is accepted without the real isolation.
+    """
+
+    def __init__(self, fast=None, verify=None):
+        self.fast = fast or ForkserverSandbox()
+        self.verify = verify or DockerSandbox()
+
+    def run(self, code: str, tests: str) -> ExecutionResult:
+        try:
+            result = self.fast.run(code, tests)
+        except Exception:
+            # the fast path itself failed (forkserver didn't start etc)
+            return self.verify.run(code, tests)
+        
+        # only a clean test failure or a timeout is trusted as a failure -
+        # a crashed child or a pytest error goes to the real sandbox, so
+        # correct code is never "repaired" because of the fast path
+        if result.exit_code == _TESTS_FAILED or result.timeout_occurred:
+            return result
+        return self.verify.run(code, tests)
+
+    def prewarm(self):
+        prewarm = getattr(self.verify, "prewarm", None)
+        if prewarm is not None:
+            prewarm()
+
+    def is_available(self) -> bool:
+        return self.fast.is_available() and self.verify.is_available()
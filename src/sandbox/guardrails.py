@@ -2,6 +2,7 @@
 
 
 import re
+from functools import lru_cache
 from typing import List, Tuple
 
 
@@ -45,6 +46,15 @@ MALICIOUS_PATTERNS = [
 ]
 
 
+_COMPILED_PATTERNS = tuple(
+    (re.compile(pattern, re.IGNORECASE), description)
+    for pattern, description in MALICIOUS_PATTERNS
+)
+
+_TEST_DEF_RE = re.compile(r"\bdef\s+test_")
+_PYTEST_IMPORT_RE = re.compile(r"\bimport\s+pytest\b")
+
+
 def check_code_safety(code: str) -> Tuple[bool, List[str]]:
     """
     Check if code contains potentially malicious patterns.
@@ -55,14 +65,17 @@ def check_code_safety(code: str) -> Tuple[bool, List[str]]:
     Returns:
         Tuple of (is_safe, list_of_violations)
     """
-    violations = []
-    
-    for pattern, description in MALICIOUS_PATTERNS:
-        if re.search(pattern, code, re.IGNORECASE):
-            violations.append(description)
+    violations = _violations(code)
     
     is_safe = len(violations) == 0
-    return is_safe, violations
+    return is_safe, list(violations)
+
+
+# the repair loop often gets the same code back (retries, cached responses),
+# so verdicts are memoized on the code string
+@lru_cache(maxsize=1024)
+def _violations(code: str) -> Tuple[str, ...]:
+    return tuple(description for pattern, description in _COMPILED_PATTERNS if pattern.search(code))
 
 
 def check_test_integrity(original_tests: str, generated_code: str) -> Tuple[bool, str]:
@@ -76,12 +89,19 @@ def check_test_integrity(original_tests: str, generated_code: str) -> Tuple[bool
     Returns:
         Tuple of (is_valid, reason)
     """
+    # only the generated code is inspected - the tests are the same on every
+    # attempt, so the verdict is cached per code string
+    return _integrity(generated_code)
+
+
+@lru_cache(maxsize=1024)
+def _integrity(generated_code: str) -> Tuple[bool, str]:
     # Check if generated code contains test functions
-    if re.search(r"\bdef\s+test_", generated_code):
+    if _TEST_DEF_RE.search(generated_code):
         return False, "Generated code contains test functions"
     
     # Check if generated code contains pytest imports
-    if re.search(r"\bimport\s+pytest\b", generated_code):
+    if _PYTEST_IMPORT_RE.search(generated_code):
         return False, "Generated code imports pytest"
     
     # Check if generated code contains assertions that look like tests
@@ -0,0 +1,41 @@
+"""
+Sliding-window rate limiter for async API calls.
+"""
+
+import time
+import asyncio
+from collections import deque
+
+
+class AsyncRateLimiter:
+    # allows max_rate acquires in any time_period seconds. the start times of
+    # the last max_rate acquires are kept, and a caller waits until the oldest
+    # one has left the window - so no time_period-long span ever holds more
+    # than max_rate calls, unlike a full token bucket that bursts max_rate
+    # and then keeps refilling within the same window
+
+    def __init__(self, max_rate: int, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._stamps: deque = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._stamps and now - self._stamps[0] >= self.time_period:
+                    self._stamps.popleft()
+
+                if len(self._stamps) < self.max_rate:
+                    self._stamps.append(now)
+                    return
+
+                await asyncio.sleep(self._stamps[0] + self.time_period - now)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
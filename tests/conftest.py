@@ -0,0 +1,43 @@
+"""
+Shared fixtures. fake_docker stands in for the docker CLI, so the sandbox
+pool and batch logic run without a daemon.
+"""
+
+import os
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+FAKEBIN = Path(__file__).parent / "fakebin"
+
+
+class FakeDocker:
+    """Handle on the fake docker CLI's call log."""
+
+    def __init__(self, log: Path):
+        self.log = log
+
+    def calls(self, op: str = None) -> list:
+        if not self.log.exists():
+            return []
+        calls = [json.loads(line) for line in self.log.read_text().splitlines()]
+        return [c for c in calls if op is None or c[0] == op]
+
+    def started(self) -> int:
+        return sum(1 for c in self.calls("run") if "-d" in c)
+
+    def removed(self) -> list:
+        return [name for c in self.calls("rm") for name in c[2:]]
+
+
+@pytest.fixture
+def fake_docker(tmp_path, monkeypatch):
+    """Put tests/fakebin/docker first on PATH, with its state in tmp_path."""
+    if os.name != "posix" or shutil.which("timeout") is None:
+        pytest.skip("the fake docker runs the sandbox's shell commands on the host")
+    monkeypatch.setenv("PATH", f"{FAKEBIN}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_DOCKER_STATE", str(tmp_path / "docker.json"))
+    monkeypatch.setenv("FAKE_DOCKER_LOG", str(tmp_path / "docker.log"))
+    return FakeDocker(tmp_path / "docker.log")
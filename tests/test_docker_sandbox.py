@@ -0,0 +1,132 @@
+"""
+DockerSandbox pool and batch runs, against the fake docker CLI.
+"""
+
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.sandbox import docker_runner
+from src.sandbox.docker_runner import DockerSandbox
+
+PASSING = ("def add(a, b):\n    return a + b", "def test_add():\n    assert add(2, 3) == 5")
+FAILING = ("def add(a, b):\n    return a - b", "def test_add():\n    assert add(2, 3) == 5")
+HANGING = ("import time\n\ndef add(a, b):\n    time.sleep(30)", "def test_add():\n    add(2, 3)")
+
+
+@pytest.fixture
+def sandbox(fake_docker):
+    box = DockerSandbox(timeout=2, pool_size=2)
+    yield box
+    box.close()
+
+
+def test_fake_docker_neutralizes_the_scrub():
+    # keep the fake in step - otherwise it would run the scrub on the host
+    fake = (Path(__file__).parent / "fakebin" / "docker").read_text()
+    assert repr(docker_runner._SCRUB) in fake or f'"{docker_runner._SCRUB}"' in fake
+
+
+def test_runs_reuse_the_pooled_container(sandbox, fake_docker):
+    assert sandbox.run(*PASSING).passed
+    result = sandbox.run(*FAILING)
+    assert not result.passed and result.exit_code == 1
+    assert "assert -1 == 5" in result.stdout
+    assert fake_docker.started() == 1
+
+
+def test_repeated_candidate_comes_from_the_result_cache(sandbox, fake_docker):
+    sandbox.run(*FAILING)
+    sandbox.run(*FAILING)
+    assert len(fake_docker.calls("exec")) == 1
+
+
+def test_release_returns_the_container_to_the_pool(sandbox):
+    first = sandbox.acquire()
+    sandbox.release(first)
+    assert sandbox.acquire() == first
+
+
+def test_pool_grows_up_to_pool_size(sandbox):
+    a, b = sandbox.acquire(), sandbox.acquire()
+    assert a != b
+    assert sandbox._containers == [a, b]
+
+
+def test_timeout_discards_the_container(sandbox, fake_docker):
+    result = sandbox.run(*HANGING)
+    assert result.timeout_occurred and not result.passed
+    assert sandbox._containers == []
+    assert len(fake_docker.removed()) == 1
+
+    # the next run gets a fresh container, not the one still running pytest
+    assert sandbox.run(*PASSING).passed
+    assert fake_docker.started() == 2
+
+
+def test_close_while_acquiring_keeps_the_container_tracked(sandbox, fake_docker, monkeypatch):
+    start = sandbox._start_container
+
+    def slow_start():
+        time.sleep(0.3)
+        return start()
+
+    monkeypatch.setattr(sandbox, "_start_container", slow_start)
+    got = []
+    t = threading.Thread(target=lambda: got.append(sandbox.acquire()))
+    t.start()
+    time.sleep(0.1)
+    sandbox.close()
+    t.join()
+
+    assert sandbox._containers == got
+    sandbox.close()
+    assert fake_docker.removed() == got
+
+
+def test_release_after_close_removes_the_container(sandbox, fake_docker):
+    container = sandbox.acquire()
+    sandbox.close()
+    sandbox.release(container)
+    assert sandbox._idle.empty()
+    assert container in fake_docker.removed()
+
+
+def test_one_off_containers(fake_docker):
+    box = DockerSandbox(timeout=2, persistent=False)
+    try:
+        assert box.run(*PASSING).passed
+        assert not box.run(*FAILING).passed
+    finally:
+        box.close()
+    assert fake_docker.started() == 0
+    assert len(fake_docker.calls("run")) == 2
+
+
+def test_batch_splits_results_per_candidate(sandbox, fake_docker):
+    results = sandbox.run_batch([PASSING, FAILING, ("def add(:", PASSING[1])])
+
+    assert [r.passed for r in results] == [True, False, False]
+    assert results[0].exit_code == 0 and results[1].exit_code == 1
+    assert "assert -1 == 5" in results[1].stdout
+    assert docker_runner._BATCH_MARKER not in results[0].stdout + results[1].stdout
+    # the syntax error never reached docker
+    assert "SyntaxError" in results[2].stderr
+    assert len(fake_docker.calls("exec")) == 1
+
+
+def test_batch_candidate_that_dies_without_output(sandbox):
+    # pytest killed mid-collection prints nothing, not even a newline - the
+    # marker must still be found and the next candidate parsed as usual
+    dead = (PASSING[0], "import os\nos._exit(3)")
+    failing, passing = sandbox.run_batch([dead, PASSING])
+    assert failing.exit_code == 3 and failing.stdout == ""
+    assert passing.passed
+
+
+def test_batch_timeout_only_hits_the_hanging_candidate(sandbox):
+    hanging, passing = sandbox.run_batch([HANGING, PASSING])
+    assert hanging.timeout_occurred
+    assert passing.passed and not passing.timeout_occurred
@@ -0,0 +1,57 @@
+"""
+Code extraction from model replies, for both clients.
+"""
+
+import pytest
+
+from src.llm.ollama_client import OllamaClient
+from src.llm.groq_client import GroqClient
+
+
+@pytest.fixture(params=["ollama", "groq"])
+def extract(request):
+    if request.param == "ollama":
+        client = OllamaClient()
+        yield client._extract_code
+        client.close()
+    else:
+        # _extract_code doesn't touch the API, so skip __init__ (no key needed)
+        yield GroqClient.__new__(GroqClient)._extract_code
+
+
+def test_fenced_block(extract):
+    reply = "Here you go:\n```python\ndef add(a, b):\n    return a + b\n```\nDone."
+    assert extract(reply) == "def add(a, b):\n    return a + b"
+
+
+def test_fence_at_start_of_reply(extract):
+    assert extract("```\nx = 1\n```") == "x = 1"
+
+
+def test_inline_backticks_before_the_block_are_skipped(extract):
+    reply = "Use ```x``` here\n```python\ncode\n```"
+    assert extract(reply) == "code"
+
+
+def test_empty_block_moves_on_to_the_next(extract):
+    reply = "```\n```\nthen\n```py\nreal = 1\n```"
+    assert extract(reply) == "real = 1"
+
+
+def test_python_tags(extract):
+    assert extract("[PYTHON]\ndef f():\n    return 1\n[/PYTHON]") == "def f():\n    return 1"
+
+
+def test_unterminated_tag_ollama_line_scan():
+    # no slice to end-of-string - falls through to the line scan, as with
+    # the old regex
+    client = OllamaClient()
+    try:
+        assert client._extract_code("Sure!\n[PYTHON]\ndef f():\n    return 1") == "def f():\n    return 1"
+    finally:
+        client.close()
+
+
+def test_unterminated_tag_groq_returns_reply():
+    reply = "[PYTHON]\ndef f():\n    return 1"
+    assert GroqClient.__new__(GroqClient)._extract_code(reply) == reply
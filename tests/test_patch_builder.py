@@ -0,0 +1,111 @@
+"""
+Focused repair prompts: what _focus cuts and what merge_repair puts back.
+"""
+
+import ast
+
+from src.loop.error_parser import ErrorInfo, ErrorCategory
+from src.loop.patch_builder import _focus, merge_repair, build_focused_repair_prompt
+
+CODE = '''import math
+
+LIMIT = 10
+
+
+def inner(x):
+    return x
+
+
+def helper(x):
+    return inner(x) * 2
+
+
+def target(a):
+    return helper(a) + 1
+
+
+def remainder():
+    return 0
+
+
+def other():
+    return remainder()
+'''
+
+
+def error(category=ErrorCategory.RUNTIME, traceback="", failing_tests=()):
+    return ErrorInfo(category, "ValueError", "boom", traceback=traceback, failing_tests=list(failing_tests))
+
+
+def test_keeps_the_traceback_function_and_its_callees():
+    # line 15 is inside target(), which calls helper(), which calls inner()
+    focused, cut = _focus(CODE, error(traceback="solution.py:15: ValueError"))
+    assert set(cut) == {"remainder", "other"}
+    assert "def target" in focused and "def helper" in focused and "def inner" in focused
+    assert "import math" in focused and "LIMIT = 10" in focused
+
+
+def test_test_name_match_is_exact():
+    # test_other keeps other() (and remainder), not every name containing it
+    _, cut = _focus(CODE, error(failing_tests=["test_other"]))
+    assert set(cut) == {"inner", "helper", "target"}
+
+    assert _focus(CODE, error(failing_tests=["test_her"])) == (CODE, ())
+
+
+def test_test_solution_lines_are_ignored():
+    assert _focus(CODE, error(traceback="test_solution.py:15: in test_x")) == (CODE, ())
+
+
+def test_logic_error_without_solution_lines_is_not_focused():
+    # a failed assert names no function in the solution - the bug may be in
+    # any of them
+    assert _focus(CODE, error(ErrorCategory.LOGIC, failing_tests=["test_other"])) == (CODE, ())
+
+
+def test_functions_used_by_top_level_code_are_kept():
+    code = CODE + "\nRESULT = target(1)\n"
+    _, cut = _focus(code, error(failing_tests=["test_other"]))
+    assert cut == ()
+
+
+def test_unparseable_code_is_not_focused():
+    broken = "def f(:\n    pass\n"
+    assert _focus(broken, error(traceback="solution.py:1")) == (broken, ())
+
+
+def test_focused_prompt_omits_the_cut_functions():
+    prompt, cut = build_focused_repair_prompt(CODE, error(traceback="solution.py:15"))
+    assert set(cut) == {"remainder", "other"}
+    assert "def other" not in prompt and "def target" in prompt
+
+
+def test_merge_restores_cut_functions_and_dropped_imports():
+    focused, cut = _focus(CODE, error(traceback="solution.py:15"))
+    # the reply only has the function that was fixed
+    fixed = "def target(a):\n    return helper(a) + 2\n"
+    merged = merge_repair(CODE, fixed, cut)
+
+    names = [n.name for n in ast.parse(merged).body if isinstance(n, ast.FunctionDef)]
+    assert sorted(names) == ["other", "remainder", "target"]
+    assert "import math" in merged and "LIMIT = 10" in merged
+    assert "return helper(a) + 2" in merged
+    assert "return helper(a) + 1" not in merged
+
+
+def test_merge_keeps_the_reply_version_of_a_cut_function():
+    fixed = "def target(a):\n    return 0\n\n\ndef other():\n    return 42\n"
+    merged = merge_repair(CODE, fixed, ("remainder", "other"))
+    assert "return 42" in merged and "return remainder()" not in merged
+
+
+def test_merge_puts_restored_code_after_the_reply_imports():
+    fixed = "import os\n\ndef target(a):\n    return os.sep\n"
+    merged = merge_repair(CODE, fixed, ("other",))
+    assert merged.startswith("import os\n\nimport math")
+
+
+def test_merge_without_cut_returns_the_reply():
+    assert merge_repair(CODE, "x = 1\n", ()) == "x = 1\n"
+    # and an unparseable reply is passed through for the next attempt to fix
+    assert merge_repair(CODE, "def f(:", ("other",)) == "def f(:"